@@ -1,20 +1,169 @@
-from flask import Flask, request, jsonify
+import hashlib
+import hmac
+import threading
+from functools import wraps
+from flask import Flask, Response, g, has_request_context, make_response, request, jsonify
 from flask_cors import CORS
+from werkzeug.middleware.proxy_fix import ProxyFix
 from datetime import datetime
+from application_server.config import Config
 from application_server.models import Task
-from business_logic.database import TaskDatabase
+from application_server.profiling import ProfiledStorage, RequestProfiler
+from application_server.throttling import SingleFlight, TokenBucketLimiter
+from business_logic.storage import IDEMPOTENCY_PENDING
 
 app = Flask(__name__)
+app.config.from_object(Config)
 CORS(app)  # Enable CORS for Flutter app
 
-# Initialize database
-db = TaskDatabase()
+# Behind reverse proxies, remote_addr (and so the rate limit key) comes from X-Forwarded-For
+if app.config['TRUSTED_PROXIES'] > 0:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config['TRUSTED_PROXIES'])
+
+# Database is opened on first use so importing the app stays cheap
+db = None
+backup_job = None
+_db_lock = threading.Lock()
+
+def get_db():
+    global db, backup_job
+    if db is None:
+        with _db_lock:
+            if db is None:
+                from business_logic.storage import create_storage
+                engine = app.config['STORAGE_ENGINE']
+                options = {}
+                if engine == 'sqlite':
+                    options = {'durability': app.config['DATABASE_DURABILITY'],
+                               'batch_window_ms': app.config['DATABASE_BATCH_WINDOW_MS']}
+                db = create_storage(engine, app.config['DATABASE_PATH'], **options)
+                
+                if engine == 'sqlite' and app.config['BACKUP_INTERVAL_SECONDS'] > 0:
+                    from business_logic.backup import BackupJob, SnapshotManager
+                    manager = SnapshotManager(app.config['DATABASE_PATH'], app.config['BACKUP_DIR'],
+                                              keep=app.config['BACKUP_KEEP'])
+                    backup_job = BackupJob(manager, app.config['BACKUP_INTERVAL_SECONDS'])
+                    backup_job.start()
+    
+    # Profiled requests see a proxy that times every storage call
+    if has_request_context() and 'storage_timings' in g:
+        return ProfiledStorage(db, g.storage_timings)
+    return db
+
+# Concurrent identical reads/expiry checks share one database operation
+flights = SingleFlight()
+rate_limiter = TokenBucketLimiter(app.config['RATE_LIMIT_CAPACITY'],
+                                  app.config['RATE_LIMIT_REFILL_PER_SECOND'])
+
+def rate_limited(view):
+    """Reject mutation requests from clients that exhausted their token bucket"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if app.config['RATE_LIMIT_ENABLED']:
+            allowed, retry_after = rate_limiter.acquire(request.remote_addr)
+            if not allowed:
+                response = jsonify({'error': 'Too many requests'})
+                response.headers['Retry-After'] = str(retry_after)
+                return response, 429
+        return view(*args, **kwargs)
+    return wrapper
+
+def idempotent(view):
+    """Replay the stored response when a request is retried with the same Idempotency-Key"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        key = request.headers.get('Idempotency-Key')
+        if not key:
+            return view(*args, **kwargs)
+        if len(key) > 255:
+            return jsonify({'error': 'Idempotency-Key too long'}), 400
+        
+        scoped_key = f'{request.method} {request.path} {key}'
+        fingerprint = hashlib.sha256(request.get_data()).hexdigest()
+        ttl = app.config['IDEMPOTENCY_TTL_SECONDS']
+        
+        def execute():
+            db = get_db()
+            # Claim the key durably first so a retry reaching another worker cannot run it twice
+            record = db.claim_idempotency_key(scoped_key, fingerprint, ttl,
+                                              app.config['IDEMPOTENCY_PENDING_TIMEOUT_SECONDS'])
+            if record:
+                return record, True
+            
+            try:
+                response = make_response(view(*args, **kwargs))
+            except BaseException:
+                db.release_idempotency_key(scoped_key)
+                raise
+            
+            record = (fingerprint, response.status_code, response.get_data(as_text=True))
+            # Server errors are not final, so a retry should run the request again
+            if response.status_code < 500:
+                db.complete_idempotency_key(scoped_key, response.status_code, record[2], ttl,
+                                            app.config['IDEMPOTENCY_MAX_KEYS'])
+            else:
+                db.release_idempotency_key(scoped_key)
+            return record, False
+        
+        # A retry racing the original in this process waits for it instead of writing twice
+        ((stored_fingerprint, status_code, body), replayed), shared = flights.do(
+            ('idempotency', scoped_key), execute)
+        
+        if stored_fingerprint != fingerprint:
+            return jsonify({'error': 'Idempotency-Key was already used with a different request'}), 422
+        
+        if status_code == IDEMPOTENCY_PENDING:
+            response = jsonify({'error': 'A request with this Idempotency-Key is still in progress'})
+            response.headers['Retry-After'] = '1'
+            return response, 409
+        
+        response = app.response_class(body, status=status_code, mimetype='application/json')
+        if replayed or shared:
+            response.headers['Idempotent-Replayed'] = 'true'
+        return response
+    return wrapper
+
+# Opt-in request profiling: X-Profile: 1 with a valid X-Admin-Token, or sampling
+profiler = RequestProfiler(app.config['PROFILE_SAMPLE_RATE'])
+
+def _admin_authorized():
+    token = app.config['ADMIN_TOKEN']
+    supplied = request.headers.get('X-Admin-Token', '')
+    return bool(token) and hmac.compare_digest(supplied.encode('utf-8'), token.encode('utf-8'))
+
+@app.before_request
+def start_profiling():
+    if request.path.startswith('/admin/'):
+        return
+    requested = request.headers.get('X-Profile') == '1' and _admin_authorized()
+    if requested or profiler.should_sample():
+        capture = profiler.start()
+        if capture:
+            g.profile = capture
+            g.storage_timings = {}
+
+def _finish_profiling():
+    capture = g.pop('profile', None)
+    if capture:
+        rule = request.url_rule.rule if request.url_rule else '<unmatched>'
+        profiler.stop(capture, f'{request.method} {rule}', g.pop('storage_timings', {}))
+
+@app.after_request
+def stop_profiling(response):
+    _finish_profiling()
+    return response
+
+@app.teardown_request
+def stop_profiling_on_error(exc):
+    _finish_profiling()
 
 @app.route('/health', methods=['GET'])
 def health_check():
     return jsonify({'status': 'healthy', 'timestamp': datetime.now().isoformat()})
 
 @app.route('/tasks', methods=['POST'])
+@rate_limited
+@idempotent
 def create_task():
     try:
         data = request.get_json()
@@ -31,7 +180,7 @@ def create_task():
         if time_limit_minutes <= 0:
             return jsonify({'error': 'Time limit must be positive'}), 400
         
-        task = db.add_task(title, time_limit_minutes)
+        task = get_db().add_task(title, time_limit_minutes)
         
         return jsonify({
             'message': 'Task created successfully',
@@ -46,13 +195,15 @@ def create_task():
 @app.route('/tasks', methods=['GET'])
 def get_tasks():
     try:
-        tasks = db.get_all_tasks()
+        # Recurring templates turn into tasks only once they are due
+        get_db().materialize_due_templates()
+        tasks = get_db().get_all_tasks()
         
         # Check for expired tasks and update them
         for task in tasks:
             if task.is_expired() and task.status == 'active':
                 task.mark_missed()
-                db.update_task_status(task.id, 'missed')
+                get_db().update_task_status(task.id, 'missed')
         
         # Group tasks by status
         active_tasks = [task.to_dict() for task in tasks if task.status == 'active']
@@ -72,7 +223,7 @@ def get_tasks():
 def get_task(task_id):
     """Get a specific task by ID"""
     try:
-        task = db.get_task_by_id(task_id)
+        task, _ = flights.do(('get', task_id), lambda: get_db().get_task_by_id(task_id))
         
         if not task:
             return jsonify({'error': 'Task not found'}), 404
@@ -80,7 +231,7 @@ def get_task(task_id):
         # Check if task expired
         if task.is_expired() and task.status == 'active':
             task.mark_missed()
-            db.update_task_status(task.id, 'missed')
+            get_db().update_task_status(task.id, 'missed')
         
         return jsonify({'task': task.to_dict()})
         
@@ -88,9 +239,11 @@ def get_task(task_id):
         return jsonify({'error': str(e)}), 500
 
 @app.route('/tasks/<int:task_id>/complete', methods=['PUT'])
+@rate_limited
+@idempotent
 def complete_task(task_id):
     try:
-        task = db.get_task_by_id(task_id)
+        task = get_db().get_task_by_id(task_id)
         
         if not task:
             return jsonify({'error': 'Task not found'}), 404
@@ -99,13 +252,13 @@ def complete_task(task_id):
             return jsonify({'error': f'Task is already {task.status}'}), 400
         
         if task.is_expired():
-            db.update_task_status(task_id, 'missed')
+            get_db().update_task_status(task_id, 'missed')
             return jsonify({
                 'message': 'Task was expired and marked as missed',
                 'task': task.to_dict()
             }), 200
         
-        db.update_task_status(task_id, 'completed')
+        get_db().update_task_status(task_id, 'completed')
         task.mark_completed()
         
         return jsonify({
@@ -116,19 +269,29 @@ def complete_task(task_id):
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def _expire_task(task_id):
+    task = get_db().get_task_by_id(task_id)
+    
+    if task and task.is_expired() and task.status == 'active':
+        task.mark_missed()
+        get_db().update_task_status(task_id, 'missed')
+        return task, True
+    
+    return task, False
+
 @app.route('/tasks/<int:task_id>/check-expiry', methods=['PUT'])
+@rate_limited
 def check_task_expiry(task_id):
     """Check and update task expiry status"""
     try:
-        task = db.get_task_by_id(task_id)
+        # Timers firing together collapse into a single read + update
+        (task, status_changed), _ = flights.do(('check-expiry', task_id),
+                                               lambda: _expire_task(task_id))
         
         if not task:
             return jsonify({'error': 'Task not found'}), 404
         
-        if task.is_expired() and task.status == 'active':
-            task.mark_missed()
-            db.update_task_status(task_id, 'missed')
-            
+        if status_changed:
             return jsonify({
                 'message': 'Task expired and marked as missed',
                 'task': task.to_dict(),
@@ -145,15 +308,16 @@ def check_task_expiry(task_id):
         return jsonify({'error': str(e)}), 500
 
 @app.route('/tasks/<int:task_id>', methods=['DELETE'])
+@rate_limited
 def delete_task(task_id):
     """Delete a task"""
     try:
         print(f"🗑️ Attempting to delete task with ID: {task_id}")
-        print(f"🔍 Database object: {db}")
-        print(f"🔍 Has delete_task method: {hasattr(db, 'delete_task')}")
-        print(f"🔍 Database methods: {[method for method in dir(db) if not method.startswith('_')]}")
+        print(f"🔍 Database object: {get_db()}")
+        print(f"🔍 Has delete_task method: {hasattr(get_db(), 'delete_task')}")
+        print(f"🔍 Database methods: {[method for method in dir(get_db()) if not method.startswith('_')]}")
         
-        success = db.delete_task(task_id)
+        success = get_db().delete_task(task_id)
         print(f"🗑️ Delete operation success: {success}")
         
         if not success:
@@ -169,13 +333,14 @@ def delete_task(task_id):
 def get_task_stats():
     """Get task statistics"""
     try:
-        tasks = db.get_all_tasks()
+        get_db().materialize_due_templates()
+        tasks = get_db().get_all_tasks()
         
         # Update expired tasks first
         for task in tasks:
             if task.is_expired() and task.status == 'active':
                 task.mark_missed()
-                db.update_task_status(task.id, 'missed')
+                get_db().update_task_status(task.id, 'missed')
         
         # Calculate stats
         total_tasks = len(tasks)
@@ -196,6 +361,106 @@ def get_task_stats():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/templates', methods=['POST'])
+@rate_limited
+def create_template():
+    """Create a recurring task template"""
+    try:
+        data = request.get_json()
+        
+        if not data or 'title' not in data or 'time_limit_minutes' not in data:
+            return jsonify({'error': 'Missing title or time_limit_minutes'}), 400
+        
+        interval_minutes = data.get('interval_minutes')
+        daily_at = data.get('daily_at')
+        
+        # null counts as absent
+        if (interval_minutes is None) == (daily_at is None):
+            return jsonify({'error': 'Provide exactly one of interval_minutes or daily_at'}), 400
+        
+        title = data['title'].strip()
+        time_limit_minutes = int(data['time_limit_minutes'])
+        
+        if not title:
+            return jsonify({'error': 'Title cannot be empty'}), 400
+        
+        if time_limit_minutes <= 0:
+            return jsonify({'error': 'Time limit must be positive'}), 400
+        
+        if interval_minutes is not None:
+            interval_minutes = int(interval_minutes)
+        template = get_db().add_template(title, time_limit_minutes,
+                                         interval_minutes=interval_minutes,
+                                         daily_at=daily_at)
+        
+        return jsonify({
+            'message': 'Template created successfully',
+            'template': template.to_dict()
+        }), 201
+        
+    except (ValueError, TypeError, AttributeError) as e:
+        return jsonify({'error': f'Invalid template: {e}'}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/templates', methods=['GET'])
+def get_templates():
+    """List recurring task templates"""
+    try:
+        templates = get_db().get_all_templates()
+        return jsonify({'templates': [template.to_dict() for template in templates]})
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/templates/<int:template_id>', methods=['DELETE'])
+@rate_limited
+def delete_template(template_id):
+    """Delete a recurring task template; tasks already created are kept"""
+    try:
+        if not get_db().delete_template(template_id):
+            return jsonify({'error': 'Template not found'}), 404
+        
+        return jsonify({'message': 'Template deleted successfully'})
+        
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/admin/profiles', methods=['GET'])
+def get_profiles():
+    """Profiled routes, or one route's hot functions (?route=GET /tasks[&format=pstats])"""
+    if not app.config['ADMIN_TOKEN']:
+        return jsonify({'error': 'Not found'}), 404
+    if not _admin_authorized():
+        return jsonify({'error': 'Forbidden'}), 403
+    
+    route = request.args.get('route')
+    if not route:
+        return jsonify({'routes': profiler.summary()})
+    
+    if request.args.get('format') == 'pstats':
+        data = profiler.route_pstats(route)
+        if data is None:
+            return jsonify({'error': 'No profile for route'}), 404
+        return Response(data, mimetype='application/octet-stream',
+                        headers={'Content-Disposition': 'attachment; filename=profile.pstats'})
+    
+    details = profiler.route_details(route, limit=request.args.get('limit', 30, type=int))
+    if details is None:
+        return jsonify({'error': 'No profile for route'}), 404
+    return jsonify({'route': route, **details})
+
+@app.route('/admin/profiles', methods=['DELETE'])
+def reset_profiles():
+    """Discard collected profiles"""
+    if not app.config['ADMIN_TOKEN']:
+        return jsonify({'error': 'Not found'}), 404
+    if not _admin_authorized():
+        return jsonify({'error': 'Forbidden'}), 403
+    
+    profiler.reset()
+    return jsonify({'message': 'Profiles cleared'})
+
 if __name__ == '__main__':
     print("🚀 Starting Task Manager Backend...")
     print("📍 Server running on http://localhost:5007")
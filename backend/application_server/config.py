@@ -0,0 +1,51 @@
+import os
+
+
+def _env_int(name: str, default: int) -> int:
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+
+def _env_float(name: str, default: float) -> float:
+    value = os.environ.get(name)
+    return float(value) if value else default
+
+
+class Config:
+    """Server settings, overridable through environment variables"""
+
+    # 'sqlite' (tasks.db next to the server) or 'memory' (nothing persisted)
+    STORAGE_ENGINE = os.environ.get('TASKS_STORAGE_ENGINE', 'sqlite')
+    DATABASE_PATH = os.environ.get('TASKS_DB_PATH', 'tasks.db')
+
+    # 'sync' commits every write on its own. 'batched' hands writes to one writer
+    # thread that commits whatever is queued behind the current write in a single
+    # transaction: a lone write commits at once, and under load each write waits
+    # for the batch ahead of it plus at most DATABASE_BATCH_WINDOW_MS of collecting
+    DATABASE_DURABILITY = os.environ.get('TASKS_DB_DURABILITY', 'sync')
+    DATABASE_BATCH_WINDOW_MS = _env_float('TASKS_DB_BATCH_WINDOW_MS', 5.0)
+
+    # Token bucket applied per client to the mutation routes. Buckets live in
+    # each worker process, so with N workers a client can get up to N times the limit
+    RATE_LIMIT_ENABLED = os.environ.get('TASKS_RATE_LIMIT_ENABLED', '1') != '0'
+    RATE_LIMIT_CAPACITY = _env_int('TASKS_RATE_LIMIT_CAPACITY', 30)
+    RATE_LIMIT_REFILL_PER_SECOND = _env_float('TASKS_RATE_LIMIT_REFILL_PER_SECOND', 10.0)
+    # Number of reverse proxies in front of the server whose X-Forwarded-For is
+    # trusted for the client address; 0 keys clients by the socket peer address
+    TRUSTED_PROXIES = _env_int('TASKS_TRUSTED_PROXIES', 0)
+
+    # Responses replayed for retried requests carrying an Idempotency-Key
+    IDEMPOTENCY_TTL_SECONDS = _env_float('TASKS_IDEMPOTENCY_TTL_SECONDS', 24 * 60 * 60)
+    IDEMPOTENCY_MAX_KEYS = _env_int('TASKS_IDEMPOTENCY_MAX_KEYS', 10000)
+    # A claim left pending this long (e.g. its worker died) may be taken over
+    IDEMPOTENCY_PENDING_TIMEOUT_SECONDS = _env_float('TASKS_IDEMPOTENCY_PENDING_TIMEOUT_SECONDS', 60)
+
+    # Online snapshots of the SQLite file; 0 disables the background job
+    BACKUP_INTERVAL_SECONDS = _env_float('TASKS_BACKUP_INTERVAL_SECONDS', 0)
+    BACKUP_DIR = os.environ.get('TASKS_BACKUP_DIR', 'backups')
+    BACKUP_KEEP = _env_int('TASKS_BACKUP_KEEP', 7)
+
+    # Enables /admin endpoints and header-triggered profiling when set
+    ADMIN_TOKEN = os.environ.get('TASKS_ADMIN_TOKEN', '')
+    # Fraction of requests profiled without being asked (0 disables sampling)
+    PROFILE_SAMPLE_RATE = _env_float('TASKS_PROFILE_SAMPLE_RATE', 0.0)
@@ -36,3 +36,64 @@ class Task:
     
     def mark_missed(self):
         self.status = 'missed'
+
+class TaskTemplate:
+    """Recurring task rule: every `interval_minutes`, or daily at `daily_at` ('HH:MM')"""
+
+    def __init__(self, id: int, title: str, time_limit_minutes: int,
+                 interval_minutes: int = None, daily_at: str = None,
+                 next_run_at: datetime = None, created_at: datetime = None):
+        if (interval_minutes is None) == (daily_at is None):
+            raise ValueError('Exactly one of interval_minutes or daily_at is required')
+        if interval_minutes is not None and interval_minutes <= 0:
+            raise ValueError('Interval must be positive')
+        if daily_at is not None:
+            hour, minute = (int(part) for part in daily_at.split(':'))
+            if not (0 <= hour < 24 and 0 <= minute < 60):
+                raise ValueError('daily_at must be HH:MM')
+            daily_at = f'{hour:02d}:{minute:02d}'
+
+        self.id = id
+        self.title = title
+        self.time_limit_minutes = time_limit_minutes
+        self.interval_minutes = interval_minutes
+        self.daily_at = daily_at
+        self.created_at = created_at or datetime.now()
+        self.next_run_at = next_run_at or self.first_run_at()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'id': self.id,
+            'title': self.title,
+            'time_limit_minutes': self.time_limit_minutes,
+            'interval_minutes': self.interval_minutes,
+            'daily_at': self.daily_at,
+            'created_at': self.created_at.isoformat(),
+            'next_run_at': self.next_run_at.isoformat()
+        }
+
+    def first_run_at(self) -> datetime:
+        if self.interval_minutes is not None:
+            return self.created_at
+        return self._next_daily_after(self.created_at - timedelta(microseconds=1))
+
+    def is_due(self, moment: datetime = None) -> bool:
+        return self.next_run_at <= (moment or datetime.now())
+
+    def next_run_after(self, moment: datetime) -> datetime:
+        """First occurrence strictly after moment; missed occurrences are skipped"""
+        if self.daily_at is not None:
+            return self._next_daily_after(moment)
+
+        interval = timedelta(minutes=self.interval_minutes)
+        if self.next_run_at > moment:
+            return self.next_run_at
+        steps = (moment - self.next_run_at) // interval + 1
+        return self.next_run_at + steps * interval
+
+    def _next_daily_after(self, moment: datetime) -> datetime:
+        hour, minute = (int(part) for part in self.daily_at.split(':'))
+        candidate = moment.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        if candidate <= moment:
+            candidate += timedelta(days=1)
+        return candidate
@@ -0,0 +1,140 @@
+import marshal
+import random
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+class ProfiledStorage:
+    """Storage proxy recording wall time per method into `timings`"""
+
+    def __init__(self, storage, timings: Dict[str, List[float]]):
+        self._storage = storage
+        self._timings = timings
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._storage, name)
+        if not callable(attr):
+            return attr
+
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return attr(*args, **kwargs)
+            finally:
+                entry = self._timings.setdefault(name, [0, 0.0])
+                entry[0] += 1
+                entry[1] += time.perf_counter() - start
+        return timed
+
+class _RouteProfile:
+    def __init__(self):
+        self.requests = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.storage: Dict[str, List[float]] = {}
+        self.stats = None
+
+class RequestProfiler:
+    """Opt-in cProfile capture of whole requests, aggregated per route.
+
+    Only one request is profiled at a time; requests arriving while a capture
+    is running are served unprofiled, which keeps overhead bounded and avoids
+    competing profilers.
+    """
+
+    def __init__(self, sample_rate: float = 0.0, max_routes: int = 100):
+        self.sample_rate = sample_rate
+        self.max_routes = max_routes
+        self._active = threading.Lock()
+        self._lock = threading.Lock()
+        self._routes: Dict[str, _RouteProfile] = {}
+
+    def should_sample(self) -> bool:
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def start(self):
+        """Begin a capture, or return None if another request is being profiled"""
+        if not self._active.acquire(blocking=False):
+            return None
+        import cProfile
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except (RuntimeError, ValueError):
+            # Another profiler or debugger already owns the hook
+            self._active.release()
+            return None
+        return profile, time.perf_counter()
+
+    def stop(self, capture, route: str, storage_timings: Dict[str, List[float]]):
+        profile, started = capture
+        profile.disable()
+        elapsed = time.perf_counter() - started
+        self._active.release()
+
+        import pstats
+        with self._lock:
+            entry = self._routes.get(route)
+            if entry is None:
+                if len(self._routes) >= self.max_routes:
+                    return
+                entry = self._routes[route] = _RouteProfile()
+
+            entry.requests += 1
+            entry.total_seconds += elapsed
+            entry.max_seconds = max(entry.max_seconds, elapsed)
+            for name, (calls, seconds) in storage_timings.items():
+                totals = entry.storage.setdefault(name, [0, 0.0])
+                totals[0] += calls
+                totals[1] += seconds
+            if entry.stats is None:
+                entry.stats = pstats.Stats(profile)
+            else:
+                entry.stats.add(profile)
+
+    def summary(self) -> Dict[str, Any]:
+        with self._lock:
+            return {route: self._describe(entry) for route, entry in self._routes.items()}
+
+    def route_details(self, route: str, limit: int = 30) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._routes.get(route)
+            if entry is None:
+                return None
+
+            functions = []
+            for (filename, line, name), (cc, nc, tt, ct, _) in entry.stats.stats.items():
+                functions.append({
+                    'function': f'{filename}:{line}({name})',
+                    'calls': nc,
+                    'primitive_calls': cc,
+                    'self_ms': round(tt * 1000, 3),
+                    'cumulative_ms': round(ct * 1000, 3)
+                })
+            functions.sort(key=lambda f: f['cumulative_ms'], reverse=True)
+
+            details = self._describe(entry)
+            details['functions'] = functions[:limit]
+            return details
+
+    def route_pstats(self, route: str) -> Optional[bytes]:
+        """Raw pstats data for route, loadable with pstats.Stats(path)"""
+        with self._lock:
+            entry = self._routes.get(route)
+            return marshal.dumps(entry.stats.stats) if entry else None
+
+    def reset(self):
+        with self._lock:
+            self._routes.clear()
+
+    @staticmethod
+    def _describe(entry: _RouteProfile) -> Dict[str, Any]:
+        return {
+            'requests': entry.requests,
+            'mean_ms': round(entry.total_seconds / entry.requests * 1000, 3),
+            'max_ms': round(entry.max_seconds * 1000, 3),
+            'storage': {
+                name: {'calls': calls, 'total_ms': round(seconds * 1000, 3)}
+                for name, (calls, seconds) in entry.storage.items()
+            }
+        }
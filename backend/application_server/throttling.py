@@ -0,0 +1,95 @@
+import math
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Collapse concurrent calls with the same key into one execution.
+
+    The first caller for a key runs the function; callers arriving while it
+    is in flight wait and receive the same result (or exception).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Run fn for key, returning (result, shared)"""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+
+class TokenBucketLimiter:
+    """Per-client token bucket: `capacity` burst, refilled at `refill_rate`/s"""
+
+    def __init__(self, capacity: int, refill_rate: float,
+                 clock: Callable[[], float] = time.monotonic,
+                 max_clients: int = 10000):
+        self.capacity = capacity
+        self.refill_rate = refill_rate
+        self.max_clients = max_clients
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._buckets: Dict[Hashable, Tuple[float, float]] = {}
+
+    def acquire(self, client: Hashable) -> Tuple[bool, int]:
+        """Take one token for client, returning (allowed, retry_after_seconds)"""
+        now = self._clock()
+        with self._lock:
+            if client not in self._buckets and len(self._buckets) >= self.max_clients:
+                self._prune(now)
+            tokens, updated = self._buckets.get(client, (self.capacity, now))
+            tokens = min(self.capacity, tokens + (now - updated) * self.refill_rate)
+
+            if tokens >= 1:
+                self._buckets[client] = (tokens - 1, now)
+                return True, 0
+
+            self._buckets[client] = (tokens, now)
+            if self.refill_rate <= 0:
+                return False, 60
+            return False, max(1, math.ceil((1 - tokens) / self.refill_rate))
+
+    def _prune(self, now: float):
+        # A bucket that has refilled completely is indistinguishable from a new one
+        self._buckets = {
+            client: (tokens, updated)
+            for client, (tokens, updated) in self._buckets.items()
+            if tokens + (now - updated) * self.refill_rate < self.capacity
+        }
+
+    def reset(self):
+        with self._lock:
+            self._buckets.clear()
@@ -0,0 +1,217 @@
+"""Online snapshots of the SQLite task database.
+
+Snapshots are taken with SQLite's online backup API a few pages at a time,
+pausing between steps so request traffic keeps the writer lock most of the
+time. SQLite restarts an incremental backup whenever another connection
+writes to the source. After `max_restarts` steps in a row without progress,
+or once the copy has taken as many steps as `max_restarts + 1` full passes,
+it falls back to a single pass. The database runs in WAL mode, so that pass
+does not block writers. Each snapshot gets a `.sha256` sidecar and is
+integrity-checked before it is kept; older snapshots beyond `keep` are
+rotated out.
+
+    python -m business_logic.backup snapshot
+    python -m business_logic.backup list
+    python -m business_logic.backup verify [SNAPSHOT]
+    python -m business_logic.backup restore [SNAPSHOT]
+"""
+import argparse
+import hashlib
+import os
+import sqlite3
+import sys
+import threading
+import time
+from datetime import datetime
+from typing import List, Optional
+
+SNAPSHOT_PREFIX = 'tasks-'
+SNAPSHOT_SUFFIX = '.db'
+
+class _BackupRestarting(Exception):
+    pass
+
+class SnapshotManager:
+    def __init__(self, db_name: str = 'tasks.db', backup_dir: str = 'backups', keep: int = 7,
+                 pages_per_step: int = 256, step_sleep: float = 0.005, max_restarts: int = 3):
+        self.db_name = db_name
+        self.backup_dir = backup_dir
+        self.keep = keep
+        self.pages_per_step = pages_per_step
+        self.step_sleep = step_sleep
+        self.max_restarts = max_restarts
+
+    def create_snapshot(self) -> str:
+        """Copy the live database into a new verified snapshot and rotate old ones"""
+        os.makedirs(self.backup_dir, exist_ok=True)
+        stamp = datetime.now().strftime('%Y%m%dT%H%M%S%f')
+        path = os.path.join(self.backup_dir, f'{SNAPSHOT_PREFIX}{stamp}{SNAPSHOT_SUFFIX}')
+        partial = path + '.partial'
+
+        restarts = 0
+        steps = 0
+        last_remaining = None
+
+        def throttle(status, remaining, total):
+            nonlocal restarts, steps, last_remaining
+            # A concurrent write restarts the copy (or a lock blocks it), so no pages are gained
+            if last_remaining is not None and remaining >= last_remaining:
+                restarts += 1
+            else:
+                restarts = 0
+            last_remaining = remaining
+            steps += 1
+            # Progress between restarts must not keep a busy copy going forever
+            max_steps = (self.max_restarts + 1) * (total // self.pages_per_step + 1)
+            if restarts > self.max_restarts or steps > max_steps:
+                raise _BackupRestarting()
+            # Yield the database between page batches so writers are not starved
+            time.sleep(self.step_sleep)
+
+        try:
+            source = sqlite3.connect(self.db_name)
+            target = sqlite3.connect(partial)
+            try:
+                try:
+                    source.backup(target, pages=self.pages_per_step, progress=throttle,
+                                  sleep=self.step_sleep)
+                except _BackupRestarting:
+                    # Too busy to finish incrementally; copy everything in one step
+                    source.backup(target, sleep=self.step_sleep)
+            finally:
+                target.close()
+                source.close()
+        except BaseException:
+            if os.path.exists(partial):
+                os.remove(partial)
+            raise
+
+        if not self._integrity_ok(partial):
+            os.remove(partial)
+            raise RuntimeError(f'Snapshot of {self.db_name} failed integrity check')
+
+        with open(path + '.sha256', 'w') as f:
+            f.write(_sha256(partial))
+        os.replace(partial, path)
+
+        self.rotate()
+        return path
+
+    def list_snapshots(self) -> List[str]:
+        """Snapshot paths, newest first"""
+        if not os.path.isdir(self.backup_dir):
+            return []
+        names = [name for name in os.listdir(self.backup_dir)
+                 if name.startswith(SNAPSHOT_PREFIX) and name.endswith(SNAPSHOT_SUFFIX)]
+        return [os.path.join(self.backup_dir, name) for name in sorted(names, reverse=True)]
+
+    def verify_snapshot(self, path: str) -> bool:
+        """Check the snapshot against its recorded checksum and SQLite's integrity check"""
+        checksum_path = path + '.sha256'
+        if not os.path.exists(path) or not os.path.exists(checksum_path):
+            return False
+        with open(checksum_path) as f:
+            expected = f.read().strip()
+        return _sha256(path) == expected and self._integrity_ok(path)
+
+    def restore_snapshot(self, path: Optional[str] = None) -> str:
+        """Copy a verified snapshot (latest by default) over the live database"""
+        if path is None:
+            snapshots = self.list_snapshots()
+            if not snapshots:
+                raise FileNotFoundError(f'No snapshots in {self.backup_dir}')
+            path = snapshots[0]
+
+        if not self.verify_snapshot(path):
+            raise ValueError(f'Snapshot {path} failed verification')
+
+        source = sqlite3.connect(path)
+        target = sqlite3.connect(self.db_name)
+        try:
+            source.backup(target)
+        finally:
+            target.close()
+            source.close()
+        return path
+
+    def rotate(self):
+        for path in self.list_snapshots()[self.keep:]:
+            os.remove(path)
+            if os.path.exists(path + '.sha256'):
+                os.remove(path + '.sha256')
+
+    @staticmethod
+    def _integrity_ok(path: str) -> bool:
+        conn = sqlite3.connect(path)
+        try:
+            return conn.execute('PRAGMA integrity_check').fetchone()[0] == 'ok'
+        except sqlite3.DatabaseError:
+            return False
+        finally:
+            conn.close()
+
+class BackupJob:
+    """Background thread taking a snapshot every `interval` seconds"""
+
+    def __init__(self, manager: SnapshotManager, interval: float):
+        self.manager = manager
+        self.interval = interval
+        self.last_error = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='task-db-backup', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.manager.create_snapshot()
+                self.last_error = None
+            except Exception as e:
+                self.last_error = e
+                print(f"❌ Backup failed: {e}")
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Snapshot and restore the task database')
+    parser.add_argument('command', choices=['snapshot', 'list', 'verify', 'restore'])
+    parser.add_argument('snapshot', nargs='?', help='snapshot path (defaults to the newest)')
+    parser.add_argument('--db', default=os.environ.get('TASKS_DB_PATH', 'tasks.db'))
+    parser.add_argument('--dir', default=os.environ.get('TASKS_BACKUP_DIR', 'backups'))
+    parser.add_argument('--keep', type=int, default=int(os.environ.get('TASKS_BACKUP_KEEP', 7)))
+    args = parser.parse_args(argv)
+
+    manager = SnapshotManager(args.db, args.dir, keep=args.keep)
+
+    if args.command == 'snapshot':
+        print(f"✅ Snapshot written to {manager.create_snapshot()}")
+    elif args.command == 'list':
+        for path in manager.list_snapshots():
+            print(path)
+    elif args.command == 'verify':
+        snapshots = [args.snapshot] if args.snapshot else manager.list_snapshots()
+        failed = [path for path in snapshots if not manager.verify_snapshot(path)]
+        for path in snapshots:
+            print(f"{'❌' if path in failed else '✅'} {path}")
+        return 1 if failed else 0
+    elif args.command == 'restore':
+        print(f"✅ Restored {args.db} from {manager.restore_snapshot(args.snapshot)}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,15 +1,58 @@
+import queue
 import sqlite3
-from datetime import datetime
-from typing import List, Optional
-from application_server.models import Task
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+from application_server.models import Task, TaskTemplate
+from business_logic.storage import IDEMPOTENCY_PENDING, TaskStorage
 
-class TaskDatabase:
-    def __init__(self, db_name: str = 'tasks.db'):
+DURABILITY_MODES = ('sync', 'batched')
+
+# Bump whenever the DDL in init_database changes
+SCHEMA_VERSION = 4
+
+# Expired idempotency keys are purged at least this often even below the cap
+IDEMPOTENCY_SWEEP_INTERVAL_SECONDS = 60
+
+class _PendingWrite:
+    def __init__(self, sql: str, params: tuple):
+        self.sql = sql
+        self.params = params
+        self.done = threading.Event()
+        self.lastrowid = None
+        self.rowcount = 0
+        self.error = None
+
+class TaskDatabase(TaskStorage):
+    def __init__(self, db_name: str = 'tasks.db', durability: str = 'sync',
+                 batch_window_ms: float = 5, max_batch_size: int = 256):
+        if durability not in DURABILITY_MODES:
+            raise ValueError(f'Unknown durability mode: {durability}')
+        
         self.db_name = db_name
+        self.durability = durability
+        self.batch_window = batch_window_ms / 1000
+        self.max_batch_size = max_batch_size
+        self._queue = None
+        self._writer = None
+        self._writer_lock = threading.Lock()
+        # Rows added since the last sweep counted on top of what it left behind;
+        # other workers' writes are only seen at the next sweep
+        self._idempotency_rows = 0
+        self._idempotency_swept_at = None
+        self._idempotency_lock = threading.Lock()
         self.init_database()
     
     def init_database(self):
         with sqlite3.connect(self.db_name) as conn:
+            # Persistent in the file; lets readers such as snapshots run alongside writers
+            conn.execute('PRAGMA journal_mode=WAL')
+            
+            # Skip the DDL when the file already carries the current schema
+            if conn.execute('PRAGMA user_version').fetchone()[0] == SCHEMA_VERSION:
+                return
+            
             conn.execute('''
                 CREATE TABLE IF NOT EXISTS tasks (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -19,17 +62,47 @@ class TaskDatabase:
                     status TEXT DEFAULT 'active'
                 )
             ''')
+            conn.execute('''
+                CREATE INDEX IF NOT EXISTS idx_tasks_status_created_at
+                ON tasks (status, created_at)
+            ''')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS task_templates (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    title TEXT NOT NULL,
+                    time_limit_minutes INTEGER NOT NULL,
+                    interval_minutes INTEGER,
+                    daily_at TEXT,
+                    created_at TEXT NOT NULL,
+                    next_run_at TEXT NOT NULL
+                )
+            ''')
+            conn.execute('''
+                CREATE INDEX IF NOT EXISTS idx_task_templates_next_run_at
+                ON task_templates (next_run_at)
+            ''')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS idempotency_keys (
+                    key TEXT PRIMARY KEY,
+                    fingerprint TEXT NOT NULL,
+                    status_code INTEGER NOT NULL,
+                    response_body TEXT NOT NULL,
+                    created_at TEXT NOT NULL
+                )
+            ''')
+            conn.execute('''
+                CREATE INDEX IF NOT EXISTS idx_idempotency_keys_created_at
+                ON idempotency_keys (created_at)
+            ''')
+            conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
             conn.commit()
     
     def add_task(self, title: str, time_limit_minutes: int) -> Task:
         created_at = datetime.now()
-        with sqlite3.connect(self.db_name) as conn:
-            cursor = conn.execute('''
-                INSERT INTO tasks (title, time_limit_minutes, created_at, status)
-                VALUES (?, ?, ?, ?)
-            ''', (title, time_limit_minutes, created_at.isoformat(), 'active'))
-            task_id = cursor.lastrowid
-            conn.commit()
+        task_id, _ = self._write('''
+            INSERT INTO tasks (title, time_limit_minutes, created_at, status)
+            VALUES (?, ?, ?, ?)
+        ''', (title, time_limit_minutes, created_at.isoformat(), 'active'))
         
         return Task(
             id=task_id,
@@ -45,17 +118,7 @@ class TaskDatabase:
             cursor = conn.execute('SELECT * FROM tasks ORDER BY created_at DESC')
             rows = cursor.fetchall()
         
-        tasks = []
-        for row in rows:
-            task = Task(
-                id=row['id'],
-                title=row['title'],
-                time_limit_minutes=row['time_limit_minutes'],
-                created_at=datetime.fromisoformat(row['created_at']),
-                status=row['status']
-            )
-            tasks.append(task)
-        return tasks
+        return [self._row_to_task(row) for row in rows]
     
     def get_task_by_id(self, task_id: int) -> Optional[Task]:
         with sqlite3.connect(self.db_name) as conn:
@@ -66,23 +129,291 @@ class TaskDatabase:
         if not row:
             return None
         
-        return Task(
-            id=row['id'],
-            title=row['title'],
-            time_limit_minutes=row['time_limit_minutes'],
-            created_at=datetime.fromisoformat(row['created_at']),
-            status=row['status']
-        )
+        return self._row_to_task(row)
     
-    def update_task_status(self, task_id: int, status: str) -> bool:
+    def get_tasks_by_status(self, status: str) -> List[Task]:
         with sqlite3.connect(self.db_name) as conn:
-            cursor = conn.execute('UPDATE tasks SET status = ? WHERE id = ?', (status, task_id))
-            conn.commit()
-            return cursor.rowcount > 0
+            conn.row_factory = sqlite3.Row
+            cursor = conn.execute('SELECT * FROM tasks WHERE status = ? ORDER BY created_at DESC', (status,))
+            rows = cursor.fetchall()
+        
+        return [self._row_to_task(row) for row in rows]
+    
+    def get_active_tasks_expiring_before(self, moment: datetime) -> List[Task]:
+        # expires_at is derived, so filter the active rows in Python
+        tasks = [task for task in self.get_tasks_by_status('active') if task.expires_at <= moment]
+        return sorted(tasks, key=lambda task: (task.expires_at, task.id))
+    
+    def update_task_status(self, task_id: int, status: str) -> bool:
+        _, rowcount = self._write('UPDATE tasks SET status = ? WHERE id = ?', (status, task_id))
+        return rowcount > 0
 
     def delete_task(self, task_id: int) -> bool:
         """Delete a task by ID from the database"""
         with sqlite3.connect(self.db_name) as conn:
             cursor = conn.execute('DELETE FROM tasks WHERE id = ?', (task_id,))
             conn.commit()
-            return cursor.rowcount > 0
\ No newline at end of file
+            return cursor.rowcount > 0
+
+    def add_template(self, title: str, time_limit_minutes: int,
+                     interval_minutes: int = None, daily_at: str = None) -> TaskTemplate:
+        template = TaskTemplate(None, title, time_limit_minutes, interval_minutes, daily_at)
+        template.id, _ = self._write('''
+            INSERT INTO task_templates
+                (title, time_limit_minutes, interval_minutes, daily_at, created_at, next_run_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', (title, time_limit_minutes, template.interval_minutes, template.daily_at,
+              template.created_at.isoformat(), _timestamp(template.next_run_at)))
+        return template
+    
+    def get_all_templates(self) -> List[TaskTemplate]:
+        with sqlite3.connect(self.db_name) as conn:
+            conn.row_factory = sqlite3.Row
+            rows = conn.execute('SELECT * FROM task_templates ORDER BY id').fetchall()
+        
+        return [self._row_to_template(row) for row in rows]
+    
+    def delete_template(self, template_id: int) -> bool:
+        with sqlite3.connect(self.db_name) as conn:
+            cursor = conn.execute('DELETE FROM task_templates WHERE id = ?', (template_id,))
+            conn.commit()
+            return cursor.rowcount > 0
+    
+    def materialize_due_templates(self, now: datetime = None) -> int:
+        now = now or datetime.now()
+        due_sql = 'SELECT * FROM task_templates WHERE next_run_at <= ?'
+        
+        conn = sqlite3.connect(self.db_name, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            # Cheap lock-free probe first; most reads find nothing due
+            if conn.execute(due_sql + ' LIMIT 1', (_timestamp(now),)).fetchone() is None:
+                return 0
+            
+            # Re-read under the write lock so concurrent readers never double-create
+            conn.execute('BEGIN IMMEDIATE')
+            templates = [self._row_to_template(row)
+                         for row in conn.execute(due_sql, (_timestamp(now),)).fetchall()]
+            conn.executemany('''
+                INSERT INTO tasks (title, time_limit_minutes, created_at, status)
+                VALUES (?, ?, ?, ?)
+            ''', [(t.title, t.time_limit_minutes, now.isoformat(), 'active') for t in templates])
+            conn.executemany('UPDATE task_templates SET next_run_at = ? WHERE id = ?',
+                             [(_timestamp(t.next_run_after(now)), t.id) for t in templates])
+            conn.execute('COMMIT')
+            return len(templates)
+        except sqlite3.Error:
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            raise
+        finally:
+            conn.close()
+    
+    def claim_idempotency_key(self, key: str, fingerprint: str, ttl_seconds: float,
+                              pending_timeout_seconds: float) -> Optional[Tuple[str, int, str]]:
+        now = datetime.now()
+        conn = sqlite3.connect(self.db_name, isolation_level=None)
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            # Expired records and abandoned claims no longer hold the key
+            conn.execute('''
+                DELETE FROM idempotency_keys
+                WHERE key = ? AND (created_at <= ? OR (status_code = ? AND created_at <= ?))
+            ''', (key, _timestamp(now - timedelta(seconds=ttl_seconds)), IDEMPOTENCY_PENDING,
+                  _timestamp(now - timedelta(seconds=pending_timeout_seconds))))
+            cursor = conn.execute('''
+                INSERT OR IGNORE INTO idempotency_keys
+                    (key, fingerprint, status_code, response_body, created_at)
+                VALUES (?, ?, ?, '', ?)
+            ''', (key, fingerprint, IDEMPOTENCY_PENDING, _timestamp(now)))
+            record = None
+            if cursor.rowcount == 0:
+                record = tuple(conn.execute('''
+                    SELECT fingerprint, status_code, response_body FROM idempotency_keys WHERE key = ?
+                ''', (key,)).fetchone())
+            conn.execute('COMMIT')
+            return record
+        except sqlite3.Error:
+            if conn.in_transaction:
+                conn.execute('ROLLBACK')
+            raise
+        finally:
+            conn.close()
+    
+    def complete_idempotency_key(self, key: str, status_code: int, body: str,
+                                 ttl_seconds: float, max_entries: int):
+        now = datetime.now()
+        with sqlite3.connect(self.db_name) as conn:
+            conn.execute('''
+                UPDATE idempotency_keys SET status_code = ?, response_body = ?, created_at = ?
+                WHERE key = ?
+            ''', (status_code, body, _timestamp(now), key))
+            if self._idempotency_sweep_due(max_entries):
+                self._sweep_idempotency_keys(conn, now - timedelta(seconds=ttl_seconds), max_entries)
+            conn.commit()
+    
+    def _idempotency_sweep_due(self, max_entries: int) -> bool:
+        with self._idempotency_lock:
+            self._idempotency_rows += 1
+            now = time.monotonic()
+            if (self._idempotency_rows <= max_entries and self._idempotency_swept_at is not None and
+                    now - self._idempotency_swept_at < IDEMPOTENCY_SWEEP_INTERVAL_SECONDS):
+                return False
+            self._idempotency_swept_at = now
+            return True
+    
+    def _sweep_idempotency_keys(self, conn: sqlite3.Connection, cutoff: datetime, max_entries: int):
+        conn.execute('DELETE FROM idempotency_keys WHERE created_at <= ?', (_timestamp(cutoff),))
+        rows = conn.execute('SELECT COUNT(*) FROM idempotency_keys').fetchone()[0]
+        if rows > max_entries:
+            # Oldest finished records go first; pending claims are never evicted
+            conn.execute('''
+                DELETE FROM idempotency_keys WHERE key IN (
+                    SELECT key FROM idempotency_keys WHERE status_code != ?
+                    ORDER BY created_at LIMIT ?
+                )
+            ''', (IDEMPOTENCY_PENDING, rows - max_entries))
+        with self._idempotency_lock:
+            self._idempotency_rows = min(rows, max_entries)
+    
+    def release_idempotency_key(self, key: str):
+        with sqlite3.connect(self.db_name) as conn:
+            conn.execute('DELETE FROM idempotency_keys WHERE key = ? AND status_code = ?',
+                         (key, IDEMPOTENCY_PENDING))
+            conn.commit()
+    
+    @staticmethod
+    def _row_to_template(row: sqlite3.Row) -> TaskTemplate:
+        return TaskTemplate(
+            id=row['id'],
+            title=row['title'],
+            time_limit_minutes=row['time_limit_minutes'],
+            interval_minutes=row['interval_minutes'],
+            daily_at=row['daily_at'],
+            next_run_at=datetime.fromisoformat(row['next_run_at']),
+            created_at=datetime.fromisoformat(row['created_at'])
+        )
+
+    @staticmethod
+    def _row_to_task(row: sqlite3.Row) -> Task:
+        return Task(
+            id=row['id'],
+            title=row['title'],
+            time_limit_minutes=row['time_limit_minutes'],
+            created_at=datetime.fromisoformat(row['created_at']),
+            status=row['status']
+        )
+
+    def close(self):
+        """Flush pending batched writes and stop the writer thread"""
+        with self._writer_lock:
+            writer, self._writer = self._writer, None
+            if writer is not None:
+                self._queue.put(None)
+        if writer is not None:
+            writer.join()
+
+    def _write(self, sql: str, params: tuple) -> Tuple[Optional[int], int]:
+        """Run a single write, returning (lastrowid, rowcount) once it is committed"""
+        if self.durability == 'sync':
+            with sqlite3.connect(self.db_name) as conn:
+                cursor = conn.execute(sql, params)
+                conn.commit()
+                return cursor.lastrowid, cursor.rowcount
+        
+        pending = _PendingWrite(sql, params)
+        with self._writer_lock:
+            if self._writer is None:
+                self._queue = queue.Queue()
+                self._writer = threading.Thread(target=self._run_writer, args=(self._queue,),
+                                                name='task-db-writer', daemon=True)
+                self._writer.start()
+            self._queue.put(pending)
+        
+        # Callers are released only after the group commit containing their write
+        pending.done.wait()
+        if pending.error is not None:
+            raise pending.error
+        return pending.lastrowid, pending.rowcount
+
+    def _connect_writer(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_name, isolation_level=None, check_same_thread=False)
+
+    def _run_writer(self, writes: queue.Queue):
+        conn = self._connect_writer()
+        try:
+            running = True
+            while running:
+                first = writes.get()
+                if first is None:
+                    break
+                
+                # Only gather writes that are already queued, so a lone write commits
+                # without waiting; the window just caps how long a busy batch keeps growing
+                batch = [first]
+                deadline = time.monotonic() + self.batch_window
+                while len(batch) < self.max_batch_size and time.monotonic() < deadline:
+                    try:
+                        pending = writes.get_nowait()
+                    except queue.Empty:
+                        break
+                    if pending is None:
+                        running = False
+                        break
+                    batch.append(pending)
+                
+                if not self._commit_batch(conn, batch):
+                    # The connection may be left mid-transaction; start over with a fresh one
+                    conn.close()
+                    conn = self._connect_writer()
+        finally:
+            conn.close()
+            with self._writer_lock:
+                if self._writer is threading.current_thread():
+                    self._writer = None
+            # Never leave callers waiting on a writer that has stopped
+            while True:
+                try:
+                    pending = writes.get_nowait()
+                except queue.Empty:
+                    break
+                if pending is not None:
+                    pending.error = RuntimeError('Task database writer stopped')
+                    pending.done.set()
+
+    def _commit_batch(self, conn: sqlite3.Connection, batch: List[_PendingWrite]) -> bool:
+        """Commit batch as one transaction; returns False if the connection needs replacing"""
+        healthy = True
+        committed = False
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            for pending in batch:
+                # A savepoint per write keeps one bad statement from failing the group
+                conn.execute('SAVEPOINT pending_write')
+                try:
+                    cursor = conn.execute(pending.sql, pending.params)
+                    pending.lastrowid, pending.rowcount = cursor.lastrowid, cursor.rowcount
+                except sqlite3.Error as e:
+                    pending.error = e
+                    conn.execute('ROLLBACK TO pending_write')
+                conn.execute('RELEASE pending_write')
+            conn.execute('COMMIT')
+            committed = True
+        except Exception as e:
+            try:
+                if conn.in_transaction:
+                    conn.execute('ROLLBACK')
+            except Exception:
+                healthy = False
+            for pending in batch:
+                pending.error = pending.error or e
+        finally:
+            for pending in batch:
+                if not committed and pending.error is None:
+                    pending.error = RuntimeError('Batched write was not committed')
+                pending.done.set()
+        return healthy
+
+def _timestamp(moment: datetime) -> str:
+    # Fixed width so timestamps compare correctly as TEXT
+    return moment.isoformat(timespec='microseconds')
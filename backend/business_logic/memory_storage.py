@@ -0,0 +1,195 @@
+import bisect
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from application_server.models import Task, TaskTemplate
+from business_logic.storage import IDEMPOTENCY_PENDING, TaskStorage
+
+class _Record:
+    __slots__ = ('id', 'title', 'time_limit_minutes', 'created_at', 'expires_at', 'status')
+
+    def __init__(self, task: Task):
+        self.id = task.id
+        self.title = task.title
+        self.time_limit_minutes = task.time_limit_minutes
+        self.created_at = task.created_at
+        self.expires_at = task.expires_at
+        self.status = task.status
+
+    def to_task(self) -> Task:
+        # Hand out fresh objects so callers mutating a Task never touch the store
+        return Task(
+            id=self.id,
+            title=self.title,
+            time_limit_minutes=self.time_limit_minutes,
+            created_at=self.created_at,
+            status=self.status
+        )
+
+class InMemoryTaskDatabase(TaskStorage):
+    """Zero-I/O task storage for tests, benchmarks and ephemeral deployments.
+
+    Tasks live in a dict keyed by id, with sorted (key, id) indexes on
+    created_at (overall and per status) and on expires_at for active tasks.
+    Nothing survives the process.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._next_id = 1
+        self._tasks: Dict[int, _Record] = {}
+        self._by_created: List[Tuple[datetime, int]] = []
+        self._by_status: Dict[str, List[Tuple[datetime, int]]] = {}
+        self._active_by_expiry: List[Tuple[datetime, int]] = []
+        self._next_template_id = 1
+        self._templates: Dict[int, TaskTemplate] = {}
+        # key -> (fingerprint, status_code, body, stored_at), oldest first
+        self._idempotency: 'OrderedDict[str, Tuple[str, int, str, datetime]]' = OrderedDict()
+
+    def add_task(self, title: str, time_limit_minutes: int, created_at: datetime = None) -> Task:
+        with self._lock:
+            task = Task(
+                id=self._next_id,
+                title=title,
+                time_limit_minutes=time_limit_minutes,
+                created_at=created_at or datetime.now(),
+                status='active'
+            )
+            self._next_id += 1
+            record = _Record(task)
+            self._tasks[record.id] = record
+            bisect.insort(self._by_created, (record.created_at, record.id))
+            self._index_status(record)
+        return task
+
+    def get_all_tasks(self) -> List[Task]:
+        with self._lock:
+            return [self._tasks[task_id].to_task() for _, task_id in reversed(self._by_created)]
+
+    def get_task_by_id(self, task_id: int) -> Optional[Task]:
+        with self._lock:
+            record = self._tasks.get(task_id)
+            return record.to_task() if record else None
+
+    def get_tasks_by_status(self, status: str) -> List[Task]:
+        with self._lock:
+            index = self._by_status.get(status, [])
+            return [self._tasks[task_id].to_task() for _, task_id in reversed(index)]
+
+    def get_active_tasks_expiring_before(self, moment: datetime) -> List[Task]:
+        with self._lock:
+            end = bisect.bisect_right(self._active_by_expiry, (moment, float('inf')))
+            return [self._tasks[task_id].to_task() for _, task_id in self._active_by_expiry[:end]]
+
+    def update_task_status(self, task_id: int, status: str) -> bool:
+        with self._lock:
+            record = self._tasks.get(task_id)
+            if not record:
+                return False
+            self._unindex_status(record)
+            record.status = status
+            self._index_status(record)
+            return True
+
+    def delete_task(self, task_id: int) -> bool:
+        with self._lock:
+            record = self._tasks.pop(task_id, None)
+            if not record:
+                return False
+            self._remove(self._by_created, (record.created_at, record.id))
+            self._unindex_status(record)
+            return True
+
+    def add_template(self, title: str, time_limit_minutes: int,
+                     interval_minutes: int = None, daily_at: str = None) -> TaskTemplate:
+        with self._lock:
+            template = TaskTemplate(self._next_template_id, title, time_limit_minutes,
+                                    interval_minutes, daily_at)
+            self._next_template_id += 1
+            self._templates[template.id] = template
+            return self._copy_template(template)
+
+    def get_all_templates(self) -> List[TaskTemplate]:
+        with self._lock:
+            return [self._copy_template(template) for template in self._templates.values()]
+
+    def delete_template(self, template_id: int) -> bool:
+        with self._lock:
+            return self._templates.pop(template_id, None) is not None
+
+    def materialize_due_templates(self, now: datetime = None) -> int:
+        now = now or datetime.now()
+        with self._lock:
+            due = [template for template in self._templates.values() if template.is_due(now)]
+            for template in due:
+                self.add_task(template.title, template.time_limit_minutes, created_at=now)
+                template.next_run_at = template.next_run_after(now)
+            return len(due)
+
+    def claim_idempotency_key(self, key: str, fingerprint: str, ttl_seconds: float,
+                              pending_timeout_seconds: float) -> Optional[Tuple[str, int, str]]:
+        now = datetime.now()
+        with self._lock:
+            record = self._idempotency.get(key)
+            if record is not None:
+                fingerprint_, status_code, _, stored_at = record
+                abandoned = (status_code == IDEMPOTENCY_PENDING and
+                             stored_at <= now - timedelta(seconds=pending_timeout_seconds))
+                if stored_at > now - timedelta(seconds=ttl_seconds) and not abandoned:
+                    return record[:3]
+                del self._idempotency[key]
+            self._idempotency[key] = (fingerprint, IDEMPOTENCY_PENDING, '', now)
+            return None
+
+    def complete_idempotency_key(self, key: str, status_code: int, body: str,
+                                 ttl_seconds: float, max_entries: int):
+        now = datetime.now()
+        cutoff = now - timedelta(seconds=ttl_seconds)
+        with self._lock:
+            record = self._idempotency.pop(key, None)
+            if record is None:
+                return
+            self._idempotency[key] = (record[0], status_code, body, now)
+            while self._idempotency:
+                oldest_key, oldest = next(iter(self._idempotency.items()))
+                if oldest[3] > cutoff and len(self._idempotency) <= max_entries:
+                    break
+                del self._idempotency[oldest_key]
+
+    def release_idempotency_key(self, key: str):
+        with self._lock:
+            record = self._idempotency.get(key)
+            if record is not None and record[1] == IDEMPOTENCY_PENDING:
+                del self._idempotency[key]
+
+    def close(self):
+        pass
+
+    @staticmethod
+    def _copy_template(template: TaskTemplate) -> TaskTemplate:
+        return TaskTemplate(
+            id=template.id,
+            title=template.title,
+            time_limit_minutes=template.time_limit_minutes,
+            interval_minutes=template.interval_minutes,
+            daily_at=template.daily_at,
+            next_run_at=template.next_run_at,
+            created_at=template.created_at
+        )
+
+    def _index_status(self, record: _Record):
+        bisect.insort(self._by_status.setdefault(record.status, []), (record.created_at, record.id))
+        if record.status == 'active':
+            bisect.insort(self._active_by_expiry, (record.expires_at, record.id))
+
+    def _unindex_status(self, record: _Record):
+        self._remove(self._by_status[record.status], (record.created_at, record.id))
+        if record.status == 'active':
+            self._remove(self._active_by_expiry, (record.expires_at, record.id))
+
+    @staticmethod
+    def _remove(index: List[Tuple[datetime, int]], key: Tuple[datetime, int]):
+        position = bisect.bisect_left(index, key)
+        if position < len(index) and index[position] == key:
+            del index[position]
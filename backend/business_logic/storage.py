@@ -0,0 +1,83 @@
+from datetime import datetime
+from typing import List, Optional, Protocol, Tuple
+from application_server.models import Task, TaskTemplate
+
+STORAGE_ENGINES = ('sqlite', 'memory')
+
+# status_code of an idempotency key whose request has not finished yet
+IDEMPOTENCY_PENDING = 0
+
+class TaskStorage(Protocol):
+    """Operations every task storage engine provides to the API layer"""
+
+    def add_task(self, title: str, time_limit_minutes: int) -> Task:
+        ...
+
+    def get_all_tasks(self) -> List[Task]:
+        """All tasks, newest first"""
+        ...
+
+    def get_task_by_id(self, task_id: int) -> Optional[Task]:
+        ...
+
+    def get_tasks_by_status(self, status: str) -> List[Task]:
+        """Tasks with the given status, newest first"""
+        ...
+
+    def get_active_tasks_expiring_before(self, moment: datetime) -> List[Task]:
+        """Active tasks whose expires_at is at or before moment, soonest first"""
+        ...
+
+    def update_task_status(self, task_id: int, status: str) -> bool:
+        ...
+
+    def delete_task(self, task_id: int) -> bool:
+        ...
+
+    def add_template(self, title: str, time_limit_minutes: int,
+                     interval_minutes: int = None, daily_at: str = None) -> TaskTemplate:
+        ...
+
+    def get_all_templates(self) -> List[TaskTemplate]:
+        """All recurring templates, oldest first"""
+        ...
+
+    def delete_template(self, template_id: int) -> bool:
+        ...
+
+    def materialize_due_templates(self, now: datetime = None) -> int:
+        """Create one task per due template in a single batch; returns how many"""
+        ...
+
+    def claim_idempotency_key(self, key: str, fingerprint: str, ttl_seconds: float,
+                              pending_timeout_seconds: float) -> Optional[Tuple[str, int, str]]:
+        """Atomically reserve key for the caller.
+
+        Returns None when the caller now owns the key, otherwise the existing
+        (fingerprint, status_code, body); status_code is IDEMPOTENCY_PENDING
+        while the owner is still running. Records older than ttl_seconds, and
+        pending claims older than pending_timeout_seconds, are treated as absent.
+        """
+        ...
+
+    def complete_idempotency_key(self, key: str, status_code: int, body: str,
+                                 ttl_seconds: float, max_entries: int):
+        """Store the owner's response, evicting expired records and the oldest beyond max_entries"""
+        ...
+
+    def release_idempotency_key(self, key: str):
+        """Drop a pending claim so a retry runs the request again"""
+        ...
+
+    def close(self):
+        ...
+
+def create_storage(engine: str = 'sqlite', db_name: str = 'tasks.db', **options) -> TaskStorage:
+    """Build the storage engine named by config; options are passed to SQLite only"""
+    if engine == 'sqlite':
+        from business_logic.database import TaskDatabase
+        return TaskDatabase(db_name, **options)
+    if engine == 'memory':
+        from business_logic.memory_storage import InMemoryTaskDatabase
+        return InMemoryTaskDatabase()
+    raise ValueError(f'Unknown storage engine: {engine}')
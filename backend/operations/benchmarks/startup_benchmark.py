@@ -0,0 +1,67 @@
+"""Measure backend cold start: app import time and first-request latency.
+
+Each sample runs in a fresh interpreter inside a scratch directory so the
+relative `tasks.db` path starts out missing ("cold") and then already carries
+the current schema ("warm").
+
+    cd backend
+    python operations/benchmarks/startup_benchmark.py --runs 10
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PROBE = '''
+import json, time
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+client = app.app.test_client()
+response = client.get('/tasks')
+first_request = time.perf_counter()
+assert response.status_code == 200, response.status_code
+print(json.dumps({
+    'import_ms': (imported - start) * 1000,
+    'first_request_ms': (first_request - imported) * 1000,
+}))
+'''
+
+
+def run_probe(workdir: str) -> dict:
+    env = dict(os.environ, PYTHONPATH=BACKEND_DIR)
+    output = subprocess.run([sys.executable, '-c', PROBE], cwd=workdir, env=env,
+                            check=True, capture_output=True, text=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def summarize(label: str, samples: list):
+    for key in ('import_ms', 'first_request_ms'):
+        values = [sample[key] for sample in samples]
+        print(f"{label:<6} {key:<18} median {statistics.median(values):8.2f} ms   "
+              f"min {min(values):8.2f} ms   max {max(values):8.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5, help='samples per scenario')
+    args = parser.parse_args()
+
+    cold, warm = [], []
+    for _ in range(args.runs):
+        with tempfile.TemporaryDirectory() as workdir:
+            cold.append(run_probe(workdir))
+            warm.append(run_probe(workdir))
+
+    print(f"📊 Startup benchmark ({args.runs} runs, Python {sys.version.split()[0]})")
+    summarize('cold', cold)
+    summarize('warm', warm)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,368 @@
+"""Concurrency stress harness for the SQLite-backed task storage and API.
+
+Workers issue a mixed create/complete/check-expiry/delete/list workload for a
+fixed duration at each concurrency level, against one of three targets:
+
+    database   threads calling TaskDatabase directly
+    app        threads calling the Flask app through per-thread test clients
+    processes  separate processes, each with its own TaskDatabase
+
+A "backdate" operation pushes an active task's created_at into the past so
+completion and expiry genuinely race. After each level the harness checks:
+
+    conflicting_outcomes  tasks confirmed to one client as completed and to another as missed
+    lost_completions      tasks confirmed completed whose stored status is something else
+    row_count_mismatch    rows in the table differ from creates minus deletes
+    stats_mismatch        /tasks/stats disagrees with /tasks (app target only)
+
+    cd backend
+    python operations/benchmarks/stress_harness.py --target app --levels 1,4,16 --duration 5
+"""
+import argparse
+import contextlib
+import json
+import multiprocessing
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+from business_logic.database import TaskDatabase
+
+TARGETS = ('database', 'app', 'processes')
+
+# Relative weights of each operation in the mixed workload
+WORKLOAD = {
+    'create': 30,
+    'complete': 20,
+    'check_expiry': 15,
+    'backdate': 10,
+    'delete': 5,
+    'list': 15,
+    'stats': 5,
+}
+
+class WorkerResult:
+    def __init__(self):
+        self.ops = Counter()
+        self.errors = Counter()
+        self.latencies: List[float] = []
+        self.created: List[int] = []
+        self.deleted: List[int] = []
+        # (task_id, 'completed' | 'missed') confirmed to this worker
+        self.outcomes: List[tuple] = []
+
+    def merge(self, other: 'WorkerResult'):
+        self.ops.update(other.ops)
+        self.errors.update(other.errors)
+        self.latencies.extend(other.latencies)
+        self.created.extend(other.created)
+        self.deleted.extend(other.deleted)
+        self.outcomes.extend(other.outcomes)
+
+class LevelReport:
+    def __init__(self, target: str, concurrency: int, elapsed: float, result: WorkerResult,
+                 violations: Dict[str, list]):
+        self.target = target
+        self.concurrency = concurrency
+        self.elapsed = elapsed
+        self.result = result
+        self.violations = violations
+
+    @property
+    def total_ops(self) -> int:
+        return sum(self.result.ops.values())
+
+    @property
+    def total_errors(self) -> int:
+        return sum(self.result.errors.values())
+
+    @property
+    def throughput(self) -> float:
+        return self.total_ops / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def error_rate(self) -> float:
+        attempts = self.total_ops + self.total_errors
+        return self.total_errors / attempts if attempts else 0.0
+
+    def to_dict(self) -> dict:
+        latencies = sorted(self.result.latencies)
+        return {
+            'target': self.target,
+            'concurrency': self.concurrency,
+            'ops': self.total_ops,
+            'errors': self.total_errors,
+            'throughput_ops_per_sec': round(self.throughput, 1),
+            'error_rate': round(self.error_rate, 4),
+            'p50_ms': round(statistics.median(latencies) * 1000, 3) if latencies else None,
+            'p99_ms': round(latencies[int(len(latencies) * 0.99) - 1] * 1000, 3) if latencies else None,
+            'errors_by_type': dict(self.result.errors),
+            'violations': {name: len(items) for name, items in self.violations.items()},
+        }
+
+def _backdate(db_path: str, task_id: int):
+    # Simulate the time limit running out without waiting for it
+    past = (datetime.now() - timedelta(days=1)).isoformat()
+    with sqlite3.connect(db_path, timeout=5) as conn:
+        conn.execute("UPDATE tasks SET created_at = ? WHERE id = ? AND status = 'active'", (past, task_id))
+        conn.commit()
+
+class _Highwater:
+    """Highest task id seen, so workers can target tasks created by others"""
+
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def see(self, task_id: int):
+        with self._lock:
+            self.value = max(self.value, task_id)
+
+    def pick(self, rng: random.Random) -> int:
+        return rng.randint(1, self.value) if self.value else 1
+
+def _database_op(op: str, db: TaskDatabase, db_path: str, task_id: int, result: WorkerResult,
+                 highwater: _Highwater):
+    """Perform one operation the way app.py does, recording confirmed outcomes"""
+    if op == 'create':
+        task = db.add_task('stress', 30)
+        highwater.see(task.id)
+        result.created.append(task.id)
+    elif op == 'complete':
+        task = db.get_task_by_id(task_id)
+        if task and task.status == 'active':
+            if task.is_expired():
+                db.update_task_status(task_id, 'missed')
+                result.outcomes.append((task_id, 'missed'))
+            else:
+                db.update_task_status(task_id, 'completed')
+                result.outcomes.append((task_id, 'completed'))
+    elif op == 'check_expiry':
+        task = db.get_task_by_id(task_id)
+        if task and task.is_expired() and task.status == 'active':
+            db.update_task_status(task_id, 'missed')
+            result.outcomes.append((task_id, 'missed'))
+    elif op == 'backdate':
+        _backdate(db_path, task_id)
+    elif op == 'delete':
+        if db.delete_task(task_id):
+            result.deleted.append(task_id)
+    elif op in ('list', 'stats'):
+        for task in db.get_all_tasks():
+            if task.is_expired() and task.status == 'active':
+                db.update_task_status(task.id, 'missed')
+
+def _app_op(op: str, client, db_path: str, task_id: int, result: WorkerResult, highwater: _Highwater):
+    """Perform one operation over HTTP; 5xx responses raise so they count as errors"""
+    if op == 'create':
+        response = client.post('/tasks', data=json.dumps({'title': 'stress', 'time_limit_minutes': 30}),
+                               content_type='application/json')
+        _raise_for_server_error(response)
+        task_id = response.get_json()['task']['id']
+        highwater.see(task_id)
+        result.created.append(task_id)
+    elif op == 'complete':
+        response = client.put(f'/tasks/{task_id}/complete')
+        _raise_for_server_error(response)
+        if response.status_code == 200:
+            status = response.get_json()['task']['status']
+            result.outcomes.append((task_id, status))
+    elif op == 'check_expiry':
+        response = client.put(f'/tasks/{task_id}/check-expiry')
+        _raise_for_server_error(response)
+        if response.status_code == 200 and response.get_json()['status_changed']:
+            result.outcomes.append((task_id, 'missed'))
+    elif op == 'backdate':
+        _backdate(db_path, task_id)
+    elif op == 'delete':
+        response = client.delete(f'/tasks/{task_id}')
+        _raise_for_server_error(response)
+        if response.status_code == 200:
+            result.deleted.append(task_id)
+    elif op == 'list':
+        _raise_for_server_error(client.get('/tasks'))
+    elif op == 'stats':
+        _raise_for_server_error(client.get('/tasks/stats'))
+
+def _raise_for_server_error(response):
+    if response.status_code >= 500:
+        raise RuntimeError((response.get_json() or {}).get('error', f'HTTP {response.status_code}'))
+
+def _run_worker(perform, deadline: float, seed: int, highwater: _Highwater) -> WorkerResult:
+    rng = random.Random(seed)
+    ops, weights = zip(*WORKLOAD.items())
+    result = WorkerResult()
+
+    while time.monotonic() < deadline:
+        op = rng.choices(ops, weights)[0]
+        task_id = highwater.pick(rng)
+        start = time.perf_counter()
+        try:
+            perform(op, task_id, result)
+        except Exception as e:
+            result.errors[f'{op}: {str(e)[:60]}'] += 1
+            continue
+        result.latencies.append(time.perf_counter() - start)
+        result.ops[op] += 1
+    return result
+
+def _database_worker(db_path: str, durability: str, deadline: float, seed: int,
+                     highwater: _Highwater = None) -> WorkerResult:
+    db = TaskDatabase(db_path, durability=durability)
+    highwater = highwater or _Highwater()
+    try:
+        return _run_worker(lambda op, task_id, result: _database_op(op, db, db_path, task_id, result, highwater),
+                           deadline, seed, highwater)
+    finally:
+        db.close()
+
+def _process_worker(args) -> WorkerResult:
+    db_path, durability, duration, seed = args
+    # Each process has its own clock origin, so the deadline is rebuilt locally
+    return _database_worker(db_path, durability, time.monotonic() + duration, seed)
+
+def _run_threads(count: int, work) -> WorkerResult:
+    results = [None] * count
+
+    def run(index):
+        results[index] = work(index)
+
+    threads = [threading.Thread(target=run, args=(index,)) for index in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    merged = WorkerResult()
+    for result in results:
+        merged.merge(result)
+    return merged
+
+def check_invariants(db_path: str, result: WorkerResult, client=None) -> Dict[str, list]:
+    """Compare what clients were told against what the database ended up holding"""
+    violations = {}
+
+    confirmed = defaultdict(set)
+    for task_id, outcome in result.outcomes:
+        confirmed[task_id].add(outcome)
+    violations['conflicting_outcomes'] = sorted(
+        task_id for task_id, outcomes in confirmed.items() if {'completed', 'missed'} <= outcomes)
+
+    with sqlite3.connect(db_path) as conn:
+        stored = dict(conn.execute('SELECT id, status FROM tasks').fetchall())
+
+    violations['lost_completions'] = sorted(
+        task_id for task_id, outcomes in confirmed.items()
+        if outcomes == {'completed'} and task_id in stored and stored[task_id] != 'completed')
+
+    expected_rows = len(set(result.created) - set(result.deleted))
+    violations['row_count_mismatch'] = [] if len(stored) == expected_rows else [(len(stored), expected_rows)]
+
+    # Only the HTTP target has an independent stats path to compare against
+    if client is not None:
+        # Reading /tasks first settles any expiry so both views see the same statuses
+        listing = client.get('/tasks').get_json()
+        stats = client.get('/tasks/stats').get_json()
+        observed = {status: len(listing[status]) for status in ('active', 'completed', 'missed')}
+        reported = {'active': stats['active_tasks'], 'completed': stats['completed_tasks'],
+                    'missed': stats['missed_tasks']}
+        consistent = observed == reported and stats['total_tasks'] == sum(observed.values())
+        violations['stats_mismatch'] = [] if consistent else [(observed, reported)]
+
+    return violations
+
+def run_level(target: str, concurrency: int, duration: float, db_path: str,
+              durability: str = 'sync', seed: int = 0) -> LevelReport:
+    """Run one concurrency level against a fresh database file and check invariants"""
+    if target not in TARGETS:
+        raise ValueError(f'Unknown target: {target}')
+
+    TaskDatabase(db_path).close()
+    started = time.monotonic()
+    deadline = started + duration
+    client = None
+
+    if target == 'database':
+        highwater = _Highwater()
+        result = _run_threads(concurrency, lambda index: _database_worker(
+            db_path, durability, deadline, seed + index, highwater))
+    elif target == 'processes':
+        with multiprocessing.Pool(concurrency) as pool:
+            results = pool.map(_process_worker,
+                               [(db_path, durability, duration, seed + index) for index in range(concurrency)])
+        result = WorkerResult()
+        for worker_result in results:
+            result.merge(worker_result)
+    else:
+        import app as app_module
+        highwater = _Highwater()
+
+        def app_worker(index):
+            worker_client = app_module.app.test_client()
+            return _run_worker(lambda op, task_id, result: _app_op(op, worker_client, db_path, task_id,
+                                                                   result, highwater),
+                               deadline, seed + index, highwater)
+
+        # app.py logs every delete to stdout; keep the report readable
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            # Point the app at the stress database only for this level, then put it back
+            previous_db = app_module.db
+            previous_rate_limit = app_module.app.config['RATE_LIMIT_ENABLED']
+            app_module.app.config['RATE_LIMIT_ENABLED'] = False
+            app_module.db = TaskDatabase(db_path, durability=durability)
+            try:
+                result = _run_threads(concurrency, app_worker)
+                client = app_module.app.test_client()
+                violations = check_invariants(db_path, result, client)
+            finally:
+                app_module.db.close()
+                app_module.db = previous_db
+                app_module.app.config['RATE_LIMIT_ENABLED'] = previous_rate_limit
+        return LevelReport(target, concurrency, time.monotonic() - started, result, violations)
+
+    elapsed = time.monotonic() - started
+    return LevelReport(target, concurrency, elapsed, result, check_invariants(db_path, result))
+
+def main():
+    parser = argparse.ArgumentParser(description='Concurrency stress harness for the task backend')
+    parser.add_argument('--target', choices=TARGETS, default='database')
+    parser.add_argument('--levels', default='1,2,4,8,16', help='comma separated worker counts')
+    parser.add_argument('--duration', type=float, default=3.0, help='seconds per level')
+    parser.add_argument('--durability', choices=('sync', 'batched'), default='sync')
+    parser.add_argument('--json', action='store_true', help='print one JSON report per level')
+    args = parser.parse_args()
+
+    print(f"🔥 Stress target={args.target} durability={args.durability} duration={args.duration}s")
+    if not args.json:
+        print(f"{'workers':>7} {'ops/s':>9} {'errors':>7} {'err%':>6} {'p50 ms':>8} {'p99 ms':>8}  violations")
+
+    for level in (int(value) for value in args.levels.split(',')):
+        with tempfile.TemporaryDirectory() as workdir:
+            report = run_level(args.target, level, args.duration, os.path.join(workdir, 'stress.db'),
+                               durability=args.durability)
+        summary = report.to_dict()
+        if args.json:
+            print(json.dumps(summary))
+            continue
+
+        violations = ', '.join(f'{name}={count}' for name, count in summary['violations'].items() if count)
+        print(f"{level:>7} {summary['throughput_ops_per_sec']:>9.1f} {summary['errors']:>7} "
+              f"{summary['error_rate'] * 100:>5.1f}% {summary['p50_ms'] or 0:>8.2f} "
+              f"{summary['p99_ms'] or 0:>8.2f}  {violations or 'none'}")
+        for error, count in summary['errors_by_type'].items():
+            print(f"{'':>9}↳ {count} × {error}")
+
+if __name__ == '__main__':
+    main()
@@ -1,9 +1,11 @@
 import unittest
+import hashlib
 import json
 import tempfile
 import os
 from app import app
 from business_logic.database import TaskDatabase
+from business_logic.memory_storage import InMemoryTaskDatabase
 
 
 class TestFlaskApp(unittest.TestCase):
@@ -20,11 +22,13 @@ class TestFlaskApp(unittest.TestCase):
         # Replace the global db with test database
         import app as app_module
         app_module.db = TaskDatabase(self.db_path)
+        app_module.rate_limiter.reset()
         
         self.client = app.test_client()
     
     def tearDown(self):
         """Clean up after tests"""
+        app.config['ADMIN_TOKEN'] = ''
         os.close(self.db_fd)
         os.unlink(self.db_path)
     
@@ -247,3 +251,253 @@ class TestFlaskApp(unittest.TestCase):
         self.assertEqual(data['completed_tasks'], 1)
         self.assertEqual(data['missed_tasks'], 0)
         self.assertEqual(data['completion_rate'], 50.0)
+    
+    def test_check_expiry_unchanged(self):
+        """Test checking expiry of a task that is still running"""
+        task_data = {'title': 'Still Running', 'time_limit_minutes': 30}
+        create_response = self.client.post('/tasks',
+                                          data=json.dumps(task_data),
+                                          content_type='application/json')
+        task_id = json.loads(create_response.data)['task']['id']
+        
+        response = self.client.put(f'/tasks/{task_id}/check-expiry')
+        self.assertEqual(response.status_code, 200)
+        
+        data = json.loads(response.data)
+        self.assertFalse(data['status_changed'])
+        self.assertEqual(data['task']['status'], 'active')
+    
+    def test_mutation_rate_limited(self):
+        """Test mutation routes return 429 with Retry-After once the bucket is empty"""
+        import app as app_module
+        capacity = app_module.rate_limiter.capacity
+        
+        for _ in range(capacity):
+            response = self.client.put('/tasks/999/check-expiry')
+            self.assertEqual(response.status_code, 404)
+        
+        response = self.client.put('/tasks/999/check-expiry')
+        self.assertEqual(response.status_code, 429)
+        self.assertIn('Retry-After', response.headers)
+        
+        # Reads are not rate limited
+        response = self.client.get('/tasks')
+        self.assertEqual(response.status_code, 200)
+    
+    def test_rate_limit_keyed_by_forwarded_client(self):
+        """Test clients behind a trusted proxy get their own buckets"""
+        import app as app_module
+        from werkzeug.middleware.proxy_fix import ProxyFix
+        capacity = app_module.rate_limiter.capacity
+        wsgi_app = app.wsgi_app
+        app.wsgi_app = ProxyFix(wsgi_app, x_for=1)
+        try:
+            for _ in range(capacity):
+                self.client.put('/tasks/999/check-expiry', headers={'X-Forwarded-For': '203.0.113.1'})
+            
+            response = self.client.put('/tasks/999/check-expiry', headers={'X-Forwarded-For': '203.0.113.1'})
+            self.assertEqual(response.status_code, 429)
+            response = self.client.put('/tasks/999/check-expiry', headers={'X-Forwarded-For': '203.0.113.2'})
+            self.assertEqual(response.status_code, 404)
+        finally:
+            app.wsgi_app = wsgi_app
+    
+    def test_database_opened_lazily(self):
+        """Test the app opens its database on first use"""
+        import app as app_module
+        app_module.db = None
+        
+        with tempfile.TemporaryDirectory() as workdir:
+            cwd = os.getcwd()
+            os.chdir(workdir)
+            try:
+                self.assertFalse(os.path.exists('tasks.db'))
+                response = self.client.get('/tasks')
+                self.assertEqual(response.status_code, 200)
+                self.assertTrue(os.path.exists('tasks.db'))
+            finally:
+                app_module.get_db().close()
+                app_module.db = None
+                os.chdir(cwd)
+    
+    def test_create_template(self):
+        """Test creating a recurring template"""
+        template_data = {'title': 'Daily Review', 'time_limit_minutes': 20, 'daily_at': '18:30'}
+        
+        response = self.client.post('/templates',
+                                   data=json.dumps(template_data),
+                                   content_type='application/json')
+        self.assertEqual(response.status_code, 201)
+        
+        data = json.loads(response.data)
+        self.assertEqual(data['template']['title'], 'Daily Review')
+        self.assertEqual(data['template']['daily_at'], '18:30')
+        
+        response = self.client.get('/templates')
+        self.assertEqual(len(json.loads(response.data)['templates']), 1)
+    
+    def test_create_template_invalid_rule(self):
+        """Test templates need exactly one valid recurrence rule"""
+        for template_data in (
+            {'title': 'No Rule', 'time_limit_minutes': 20},
+            {'title': 'Null Interval', 'time_limit_minutes': 20, 'interval_minutes': None},
+            {'title': 'Null Daily', 'time_limit_minutes': 20, 'daily_at': None},
+            {'title': 'Null Limit', 'time_limit_minutes': None, 'interval_minutes': 60},
+            {'title': 'List Interval', 'time_limit_minutes': 20, 'interval_minutes': [60]},
+            {'title': 'Both', 'time_limit_minutes': 20, 'interval_minutes': 60, 'daily_at': '10:00'},
+            {'title': 'Bad Time', 'time_limit_minutes': 20, 'daily_at': 'noon'},
+            {'title': 'Zero', 'time_limit_minutes': 20, 'interval_minutes': 0},
+        ):
+            response = self.client.post('/templates',
+                                       data=json.dumps(template_data),
+                                       content_type='application/json')
+            self.assertEqual(response.status_code, 400)
+    
+    def test_template_materialized_on_read(self):
+        """Test due templates appear as active tasks when tasks are listed"""
+        template_data = {'title': 'Stretch', 'time_limit_minutes': 5, 'interval_minutes': 60}
+        self.client.post('/templates', data=json.dumps(template_data), content_type='application/json')
+        
+        data = json.loads(self.client.get('/tasks').data)
+        self.assertEqual([task['title'] for task in data['active']], ['Stretch'])
+        
+        # Listing again does not create another instance before the next run
+        data = json.loads(self.client.get('/tasks').data)
+        self.assertEqual(len(data['active']), 1)
+    
+    def test_delete_template(self):
+        """Test deleting templates"""
+        template_data = {'title': 'Stretch', 'time_limit_minutes': 5, 'interval_minutes': 60}
+        create_response = self.client.post('/templates',
+                                          data=json.dumps(template_data),
+                                          content_type='application/json')
+        template_id = json.loads(create_response.data)['template']['id']
+        
+        response = self.client.delete(f'/templates/{template_id}')
+        self.assertEqual(response.status_code, 200)
+        
+        response = self.client.delete(f'/templates/{template_id}')
+        self.assertEqual(response.status_code, 404)
+    
+    def test_admin_profiles_disabled_without_token(self):
+        """Test admin endpoints are hidden when no admin token is configured"""
+        response = self.client.get('/admin/profiles')
+        self.assertEqual(response.status_code, 404)
+    
+    def test_non_ascii_admin_token(self):
+        """Test a non-ASCII admin token is rejected instead of erroring"""
+        app.config['ADMIN_TOKEN'] = 'secret'
+        headers = {'X-Admin-Token': 'séc', 'X-Profile': '1'}
+        
+        response = self.client.get('/tasks', headers=headers)
+        self.assertEqual(response.status_code, 200)
+        
+        response = self.client.get('/admin/profiles', headers=headers)
+        self.assertEqual(response.status_code, 403)
+    
+    def test_profile_on_demand(self):
+        """Test X-Profile captures a request that the admin endpoint then serves"""
+        import app as app_module
+        app_module.profiler.reset()
+        app.config['ADMIN_TOKEN'] = 'secret'
+        admin = {'X-Admin-Token': 'secret'}
+        
+        response = self.client.get('/admin/profiles', headers={'X-Admin-Token': 'wrong'})
+        self.assertEqual(response.status_code, 403)
+        
+        self.client.get('/tasks/stats', headers={'X-Profile': '1', **admin})
+        # Without the admin token the header is ignored
+        self.client.get('/tasks', headers={'X-Profile': '1'})
+        
+        data = json.loads(self.client.get('/admin/profiles', headers=admin).data)
+        self.assertEqual(list(data['routes']), ['GET /tasks/stats'])
+        self.assertIn('get_all_tasks', data['routes']['GET /tasks/stats']['storage'])
+        
+        response = self.client.get('/admin/profiles?route=GET /tasks/stats', headers=admin)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(json.loads(response.data)['functions'])
+        
+        response = self.client.get('/admin/profiles?route=GET /tasks/stats&format=pstats', headers=admin)
+        self.assertEqual(response.mimetype, 'application/octet-stream')
+        
+        response = self.client.delete('/admin/profiles', headers=admin)
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(self.client.get('/admin/profiles', headers=admin).data)
+        self.assertEqual(data['routes'], {})
+    
+    def test_create_task_idempotent_retry(self):
+        """Test a retried create with the same Idempotency-Key creates one task"""
+        task_data = json.dumps({'title': 'Once', 'time_limit_minutes': 30})
+        headers = {'Idempotency-Key': 'create-1'}
+        
+        first = self.client.post('/tasks', data=task_data, content_type='application/json', headers=headers)
+        retry = self.client.post('/tasks', data=task_data, content_type='application/json', headers=headers)
+        
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(retry.status_code, 201)
+        self.assertEqual(retry.headers.get('Idempotent-Replayed'), 'true')
+        self.assertEqual(json.loads(first.data)['task']['id'], json.loads(retry.data)['task']['id'])
+        
+        data = json.loads(self.client.get('/tasks').data)
+        self.assertEqual(len(data['active']), 1)
+    
+    def test_idempotency_key_reused_with_different_body(self):
+        """Test reusing a key for a different request is rejected"""
+        headers = {'Idempotency-Key': 'create-2'}
+        self.client.post('/tasks', data=json.dumps({'title': 'A', 'time_limit_minutes': 30}),
+                         content_type='application/json', headers=headers)
+        
+        response = self.client.post('/tasks', data=json.dumps({'title': 'B', 'time_limit_minutes': 30}),
+                                    content_type='application/json', headers=headers)
+        self.assertEqual(response.status_code, 422)
+    
+    def test_idempotency_key_in_flight_elsewhere(self):
+        """Test a key still claimed by another worker answers 409 without running the request"""
+        import app as app_module
+        task_data = json.dumps({'title': 'Pending', 'time_limit_minutes': 30})
+        fingerprint = hashlib.sha256(task_data.encode()).hexdigest()
+        app_module.get_db().claim_idempotency_key('POST /tasks create-3', fingerprint, 60, 60)
+        
+        response = self.client.post('/tasks', data=task_data, content_type='application/json',
+                                    headers={'Idempotency-Key': 'create-3'})
+        
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.headers.get('Retry-After'), '1')
+        self.assertEqual(json.loads(self.client.get('/tasks').data)['active'], [])
+    
+    def test_complete_task_idempotent_retry(self):
+        """Test a retried complete replays success instead of 'already completed'"""
+        create_response = self.client.post('/tasks',
+                                          data=json.dumps({'title': 'Finish', 'time_limit_minutes': 30}),
+                                          content_type='application/json')
+        task_id = json.loads(create_response.data)['task']['id']
+        headers = {'Idempotency-Key': 'complete-1'}
+        
+        first = self.client.put(f'/tasks/{task_id}/complete', headers=headers)
+        retry = self.client.put(f'/tasks/{task_id}/complete', headers=headers)
+        
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(retry.status_code, 200)
+        self.assertEqual(json.loads(retry.data)['message'], 'Task completed successfully')
+        
+        # Without the key the usual error is returned
+        response = self.client.put(f'/tasks/{task_id}/complete')
+        self.assertEqual(response.status_code, 400)
+
+
+class TestFlaskAppInMemory(TestFlaskApp):
+    """Re-run the API tests against the zero-I/O storage engine"""
+    
+    def setUp(self):
+        """Set up test client backed by in-memory storage"""
+        app.config['TESTING'] = True
+        
+        import app as app_module
+        app_module.db = InMemoryTaskDatabase()
+        app_module.rate_limiter.reset()
+        
+        self.client = app.test_client()
+    
+    def tearDown(self):
+        """Nothing to clean up for in-memory storage"""
+        app.config['ADMIN_TOKEN'] = ''
@@ -0,0 +1,139 @@
+import unittest
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+from business_logic.backup import BackupJob, SnapshotManager
+from business_logic.database import TaskDatabase
+
+
+class TestSnapshotManager(unittest.TestCase):
+    
+    def setUp(self):
+        """Set up a database with a couple of tasks and an empty backup dir"""
+        self.workdir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.workdir, 'tasks.db')
+        self.backup_dir = os.path.join(self.workdir, 'backups')
+        self.db = TaskDatabase(self.db_path)
+        self.db.add_task("Task 1", 30)
+        self.db.add_task("Task 2", 45)
+        self.manager = SnapshotManager(self.db_path, self.backup_dir, keep=2,
+                                       pages_per_step=1, step_sleep=0)
+    
+    def tearDown(self):
+        """Remove the working directory"""
+        shutil.rmtree(self.workdir)
+    
+    def test_create_snapshot(self):
+        """Test a snapshot contains the live data and verifies"""
+        path = self.manager.create_snapshot()
+        
+        self.assertTrue(os.path.exists(path))
+        self.assertTrue(os.path.exists(path + '.sha256'))
+        self.assertTrue(self.manager.verify_snapshot(path))
+        self.assertEqual(len(TaskDatabase(path).get_all_tasks()), 2)
+    
+    def test_rotation_keeps_newest(self):
+        """Test only the newest `keep` snapshots remain"""
+        paths = [self.manager.create_snapshot() for _ in range(4)]
+        
+        self.assertEqual(self.manager.list_snapshots(), list(reversed(paths[-2:])))
+        self.assertFalse(os.path.exists(paths[0] + '.sha256'))
+    
+    def test_verify_detects_corruption(self):
+        """Test a modified snapshot fails checksum verification"""
+        path = self.manager.create_snapshot()
+        
+        with open(path, 'r+b') as f:
+            f.seek(-1, os.SEEK_END)
+            f.write(b'\x01')
+        
+        self.assertFalse(self.manager.verify_snapshot(path))
+        with self.assertRaises(ValueError):
+            self.manager.restore_snapshot(path)
+    
+    def test_restore_latest(self):
+        """Test restoring brings back the snapshotted state"""
+        self.manager.create_snapshot()
+        
+        task = self.db.add_task("After Snapshot", 10)
+        self.db.update_task_status(1, 'completed')
+        
+        self.manager.restore_snapshot()
+        
+        tasks = self.db.get_all_tasks()
+        self.assertEqual(len(tasks), 2)
+        self.assertIsNone(self.db.get_task_by_id(task.id))
+        self.assertEqual(self.db.get_task_by_id(1).status, 'active')
+    
+    def test_restore_without_snapshots(self):
+        """Test restoring with no snapshots available"""
+        with self.assertRaises(FileNotFoundError):
+            self.manager.restore_snapshot()
+    
+    def test_snapshot_completes_under_concurrent_writes(self):
+        """Test a snapshot finishes while another connection keeps writing"""
+        with sqlite3.connect(self.db_path) as conn:
+            conn.executemany('''
+                INSERT INTO tasks (title, time_limit_minutes, created_at, status)
+                VALUES (?, 30, '2026-01-01T00:00:00', 'active')
+            ''', [('x' * 200,) for _ in range(2000)])
+            conn.commit()
+        
+        manager = SnapshotManager(self.db_path, self.backup_dir, pages_per_step=1,
+                                  step_sleep=0.002, max_restarts=3)
+        stop = threading.Event()
+        
+        errors = []
+        
+        def writer():
+            writer_db = TaskDatabase(self.db_path)
+            while not stop.is_set():
+                try:
+                    writer_db.update_task_status(1, 'active')
+                except sqlite3.OperationalError as e:
+                    errors.append(e)
+                time.sleep(0.001)
+        
+        paths = []
+        writer_thread = threading.Thread(target=writer)
+        snapshot_thread = threading.Thread(target=lambda: paths.append(manager.create_snapshot()))
+        writer_thread.start()
+        snapshot_thread.start()
+        snapshot_thread.join(30)
+        stop.set()
+        writer_thread.join()
+        
+        self.assertFalse(snapshot_thread.is_alive(), 'snapshot did not finish under write load')
+        self.assertEqual(errors, [])
+        self.assertTrue(manager.verify_snapshot(paths[0]))
+        self.assertEqual(len(TaskDatabase(paths[0]).get_all_tasks()), 2002)
+    
+    def test_failed_snapshot_removes_partial_file(self):
+        """Test a snapshot that fails leaves no partial file behind"""
+        # Drop the WAL too, or SQLite would still read committed pages from it
+        for suffix in ('-wal', '-shm'):
+            if os.path.exists(self.db_path + suffix):
+                os.remove(self.db_path + suffix)
+        with open(self.db_path, 'wb') as f:
+            f.write(b'not a database' * 100)
+        
+        with self.assertRaises(sqlite3.DatabaseError):
+            self.manager.create_snapshot()
+        
+        self.assertEqual(os.listdir(self.backup_dir), [])
+    
+    def test_backup_job(self):
+        """Test the background job writes snapshots periodically"""
+        job = BackupJob(self.manager, interval=0.01)
+        job.start()
+        
+        deadline = time.monotonic() + 5
+        while not self.manager.list_snapshots() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        job.stop()
+        
+        self.assertTrue(self.manager.list_snapshots())
+        self.assertIsNone(job.last_error)
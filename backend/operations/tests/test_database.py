@@ -1,8 +1,11 @@
 import unittest
 import os
 import tempfile
+import sqlite3
+import threading
+import time
 from datetime import datetime, timedelta
-from business_logic.database import TaskDatabase
+from business_logic.database import TaskDatabase, SCHEMA_VERSION
 from application_server.models import Task
 
 
@@ -25,6 +28,21 @@ class TestTaskDatabase(unittest.TestCase):
         tasks = self.db.get_all_tasks()
         self.assertEqual(len(tasks), 0)
     
+    def test_schema_version_recorded(self):
+        """Test initialization stamps the schema version"""
+        with sqlite3.connect(self.db_path) as conn:
+            version = conn.execute('PRAGMA user_version').fetchone()[0]
+        self.assertEqual(version, SCHEMA_VERSION)
+    
+    def test_reopen_keeps_data(self):
+        """Test reopening a current database skips DDL and keeps rows"""
+        self.db.add_task("Persisted", 30)
+        
+        reopened = TaskDatabase(self.db_path)
+        tasks = reopened.get_all_tasks()
+        self.assertEqual(len(tasks), 1)
+        self.assertEqual(tasks[0].title, "Persisted")
+    
     def test_add_task(self):
         """Test adding a new task"""
         task = self.db.add_task("Test Task", 30)
@@ -126,3 +144,119 @@ class TestTaskDatabase(unittest.TestCase):
         updated_task = self.db.get_task_by_id(task.id)
         self.assertEqual(updated_task.status, "missed")
 
+    
+    def test_idempotency_eviction_only_over_cap(self):
+        """Test completions below the cap skip the eviction sweep"""
+        def keys():
+            with sqlite3.connect(self.db_path) as conn:
+                return [row[0] for row in conn.execute('SELECT key FROM idempotency_keys ORDER BY created_at')]
+        
+        for key in ("a", "b", "c"):
+            self.db.claim_idempotency_key(key, "abc", 60, 60)
+            self.db.complete_idempotency_key(key, 200, "{}", 60, 3)
+        self.assertEqual(keys(), ["a", "b", "c"])
+        
+        # A pending claim counts towards the cap but is never evicted
+        self.db.claim_idempotency_key("pending", "abc", 60, 60)
+        self.db.claim_idempotency_key("d", "abc", 60, 60)
+        self.db.complete_idempotency_key("d", 200, "{}", 60, 3)
+        self.assertEqual(keys(), ["c", "pending", "d"])
+
+class TestBatchedTaskDatabase(TestTaskDatabase):
+    """Re-run the database tests with group-committed writes"""
+    
+    def setUp(self):
+        """Set up batched test database before each test"""
+        self.db_fd, self.db_path = tempfile.mkstemp()
+        self.db = TaskDatabase(self.db_path, durability='batched', batch_window_ms=2)
+    
+    def tearDown(self):
+        """Stop the writer thread and clean up after each test"""
+        self.db.close()
+        super().tearDown()
+    
+    def test_concurrent_writes_are_durable(self):
+        """Test concurrent adds and updates all commit before returning"""
+        created = []
+        
+        def worker(n):
+            task = self.db.add_task(f"Task {n}", 30)
+            self.assertTrue(self.db.update_task_status(task.id, "completed"))
+            created.append(task.id)
+        
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(20)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        
+        self.assertEqual(len(set(created)), 20)
+        
+        # A separate connection sees every write
+        reader = TaskDatabase(self.db_path)
+        tasks = reader.get_all_tasks()
+        self.assertEqual(len(tasks), 20)
+        self.assertTrue(all(task.status == "completed" for task in tasks))
+    
+    def test_lone_write_does_not_wait_for_window(self):
+        """Test a write with nothing queued behind it commits without waiting out the window"""
+        db = TaskDatabase(self.db_path, durability='batched', batch_window_ms=2000)
+        try:
+            db.add_task("Warm up", 30)
+            
+            started = time.monotonic()
+            db.add_task("Alone", 30)
+            self.assertLess(time.monotonic() - started, 1)
+        finally:
+            db.close()
+    
+    def test_close_restarts_writer_on_demand(self):
+        """Test writes after close start a new writer"""
+        self.db.add_task("Before", 30)
+        self.db.close()
+        
+        task = self.db.add_task("After", 30)
+        self.assertIsNotNone(self.db.get_task_by_id(task.id))
+    
+    def test_commit_failure_reported_and_writer_recovers(self):
+        """Test a failed group commit raises for its callers and later writes still work"""
+        class FailingConnection:
+            def __init__(self, conn):
+                self._conn = conn
+            
+            @property
+            def in_transaction(self):
+                return self._conn.in_transaction
+            
+            def execute(self, sql, *args):
+                if sql == 'COMMIT':
+                    raise sqlite3.OperationalError('disk I/O error')
+                if sql == 'ROLLBACK':
+                    raise RuntimeError('rollback failed')
+                return self._conn.execute(sql, *args)
+            
+            def close(self):
+                self._conn.close()
+        
+        connect_writer = self.db._connect_writer
+        connections = []
+        
+        def flaky_connect():
+            conn = connect_writer()
+            connections.append(conn)
+            # Only the first writer connection fails
+            return FailingConnection(conn) if len(connections) == 1 else conn
+        
+        self.db._connect_writer = flaky_connect
+        
+        with self.assertRaises(sqlite3.OperationalError):
+            self.db.add_task("Lost", 30)
+        
+        task = self.db.add_task("Kept", 30)
+        self.assertIsNotNone(task.id)
+        self.assertEqual([t.title for t in self.db.get_all_tasks()], ["Kept"])
+    
+    def test_invalid_durability(self):
+        """Test unknown durability modes are rejected"""
+        with self.assertRaises(ValueError):
+            TaskDatabase(self.db_path, durability='eventually')
@@ -8,7 +8,7 @@ from datetime import datetime, timedelta
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from business_logic.database import TaskDatabase
-from application_server.models import Task
+from application_server.models import Task, TaskTemplate
 
 
 class TestTaskDatabase(unittest.TestCase):
@@ -130,3 +130,58 @@ class TestTaskDatabase(unittest.TestCase):
         self.db.update_task_status(task.id, "missed")
         updated_task = self.db.get_task_by_id(task.id)
         self.assertEqual(updated_task.status, "missed")
+
+
+class TestTaskTemplateModel(unittest.TestCase):
+    
+    def test_interval_first_run_is_creation(self):
+        """Test interval templates are due as soon as they are created"""
+        created = datetime(2026, 1, 1, 9, 0)
+        template = TaskTemplate(1, "Standup", 15, interval_minutes=60, created_at=created)
+        
+        self.assertEqual(template.next_run_at, created)
+        self.assertTrue(template.is_due(created))
+    
+    def test_interval_skips_missed_occurrences(self):
+        """Test the next run after a long gap is not backfilled"""
+        created = datetime(2026, 1, 1, 9, 0)
+        template = TaskTemplate(1, "Standup", 15, interval_minutes=60, created_at=created)
+        
+        next_run = template.next_run_after(datetime(2026, 1, 1, 12, 30))
+        self.assertEqual(next_run, datetime(2026, 1, 1, 13, 0))
+    
+    def test_daily_first_run(self):
+        """Test daily templates start at the next matching time of day"""
+        before = TaskTemplate(1, "Read", 30, daily_at="18:00", created_at=datetime(2026, 1, 1, 9, 0))
+        after = TaskTemplate(2, "Read", 30, daily_at="08:00", created_at=datetime(2026, 1, 1, 9, 0))
+        
+        self.assertEqual(before.next_run_at, datetime(2026, 1, 1, 18, 0))
+        self.assertEqual(after.next_run_at, datetime(2026, 1, 2, 8, 0))
+    
+    def test_daily_next_run(self):
+        """Test daily templates advance to the following day"""
+        template = TaskTemplate(1, "Read", 30, daily_at="7:5", created_at=datetime(2026, 1, 1, 6, 0))
+        
+        self.assertEqual(template.daily_at, "07:05")
+        self.assertEqual(template.next_run_after(datetime(2026, 1, 1, 7, 5)), datetime(2026, 1, 2, 7, 5))
+    
+    def test_invalid_rules(self):
+        """Test templates need exactly one valid rule"""
+        with self.assertRaises(ValueError):
+            TaskTemplate(1, "None", 10)
+        with self.assertRaises(ValueError):
+            TaskTemplate(1, "Both", 10, interval_minutes=5, daily_at="10:00")
+        with self.assertRaises(ValueError):
+            TaskTemplate(1, "Zero", 10, interval_minutes=0)
+        with self.assertRaises(ValueError):
+            TaskTemplate(1, "Bad Time", 10, daily_at="25:00")
+    
+    def test_to_dict(self):
+        """Test template serialization"""
+        template = TaskTemplate(3, "Stretch", 5, interval_minutes=120, created_at=datetime(2026, 1, 1, 9, 0))
+        data = template.to_dict()
+        
+        self.assertEqual(data['id'], 3)
+        self.assertEqual(data['interval_minutes'], 120)
+        self.assertIsNone(data['daily_at'])
+        self.assertEqual(data['next_run_at'], '2026-01-01T09:00:00')
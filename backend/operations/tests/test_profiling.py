@@ -0,0 +1,75 @@
+import unittest
+import marshal
+from application_server.profiling import ProfiledStorage, RequestProfiler
+from business_logic.memory_storage import InMemoryTaskDatabase
+
+
+class TestRequestProfiler(unittest.TestCase):
+    
+    def setUp(self):
+        """Set up a profiler that never samples on its own"""
+        self.profiler = RequestProfiler(sample_rate=0.0)
+    
+    def profile_once(self, route, fn, timings=None):
+        capture = self.profiler.start()
+        self.assertIsNotNone(capture)
+        try:
+            fn()
+        finally:
+            self.profiler.stop(capture, route, timings or {})
+    
+    def test_records_route(self):
+        """Test a capture is aggregated under its route"""
+        self.profile_once('GET /tasks', lambda: sorted(range(1000)))
+        self.profile_once('GET /tasks', lambda: sorted(range(1000)))
+        
+        summary = self.profiler.summary()
+        self.assertEqual(summary['GET /tasks']['requests'], 2)
+        
+        details = self.profiler.route_details('GET /tasks')
+        self.assertTrue(any('sorted' in f['function'] for f in details['functions']))
+    
+    def test_one_capture_at_a_time(self):
+        """Test a second capture is refused while one is running"""
+        capture = self.profiler.start()
+        self.assertIsNone(self.profiler.start())
+        self.profiler.stop(capture, 'GET /tasks', {})
+        
+        capture = self.profiler.start()
+        self.assertIsNotNone(capture)
+        self.profiler.stop(capture, 'GET /tasks', {})
+    
+    def test_pstats_export(self):
+        """Test raw pstats data round-trips through marshal"""
+        self.profile_once('GET /tasks/stats', lambda: sum(range(100)))
+        
+        stats = marshal.loads(self.profiler.route_pstats('GET /tasks/stats'))
+        self.assertIsInstance(stats, dict)
+        self.assertIsNone(self.profiler.route_pstats('GET /missing'))
+    
+    def test_storage_timings(self):
+        """Test storage calls made through the proxy are reported per method"""
+        timings = {}
+        storage = ProfiledStorage(InMemoryTaskDatabase(), timings)
+        
+        def work():
+            storage.add_task("Timed", 10)
+            storage.get_all_tasks()
+            storage.get_all_tasks()
+        
+        self.profile_once('GET /tasks', work, timings)
+        
+        storage_summary = self.profiler.summary()['GET /tasks']['storage']
+        self.assertEqual(storage_summary['add_task']['calls'], 1)
+        self.assertEqual(storage_summary['get_all_tasks']['calls'], 2)
+    
+    def test_sampling(self):
+        """Test sample rate bounds"""
+        self.assertFalse(RequestProfiler(sample_rate=0.0).should_sample())
+        self.assertTrue(RequestProfiler(sample_rate=1.0).should_sample())
+    
+    def test_reset(self):
+        """Test reset discards collected profiles"""
+        self.profile_once('GET /tasks', lambda: None)
+        self.profiler.reset()
+        self.assertEqual(self.profiler.summary(), {})
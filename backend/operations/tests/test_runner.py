@@ -5,9 +5,15 @@ import os
 # Add the backend directory to Python path
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from test_database import TestTaskDatabase
-from test_models import TestTaskModel
-from test_app import TestFlaskApp
+from test_database import TestTaskDatabase, TestBatchedTaskDatabase
+from test_models import TestTaskModel, TestTaskTemplateModel
+from test_app import TestFlaskApp, TestFlaskAppInMemory
+from test_storage_conformance import (TestSQLiteStorageConformance, TestBatchedSQLiteStorageConformance,
+                                      TestInMemoryStorageConformance, TestCreateStorage)
+from test_backup import TestSnapshotManager
+from test_profiling import TestRequestProfiler
+from test_stress_harness import TestStressHarness
+from test_throttling import TestSingleFlight, TestTokenBucketLimiter
 
 if __name__ == '__main__':
     # Create test suite
@@ -15,12 +21,34 @@ if __name__ == '__main__':
     
     # Add database tests
     test_suite.addTest(unittest.makeSuite(TestTaskDatabase))
+    test_suite.addTest(unittest.makeSuite(TestBatchedTaskDatabase))
     
     # Add model tests
     test_suite.addTest(unittest.makeSuite(TestTaskModel))
+    test_suite.addTest(unittest.makeSuite(TestTaskTemplateModel))
     
     # Add Flask app tests
     test_suite.addTest(unittest.makeSuite(TestFlaskApp))
+    test_suite.addTest(unittest.makeSuite(TestFlaskAppInMemory))
+    
+    # Add storage engine conformance tests
+    test_suite.addTest(unittest.makeSuite(TestSQLiteStorageConformance))
+    test_suite.addTest(unittest.makeSuite(TestBatchedSQLiteStorageConformance))
+    test_suite.addTest(unittest.makeSuite(TestInMemoryStorageConformance))
+    test_suite.addTest(unittest.makeSuite(TestCreateStorage))
+    
+    # Add backup tests
+    test_suite.addTest(unittest.makeSuite(TestSnapshotManager))
+    
+    # Add profiling tests
+    test_suite.addTest(unittest.makeSuite(TestRequestProfiler))
+    
+    # Add stress harness tests
+    test_suite.addTest(unittest.makeSuite(TestStressHarness))
+    
+    # Add throttling tests
+    test_suite.addTest(unittest.makeSuite(TestSingleFlight))
+    test_suite.addTest(unittest.makeSuite(TestTokenBucketLimiter))
     
     # Run tests
     runner = unittest.TextTestRunner(verbosity=2)
@@ -0,0 +1,235 @@
+import unittest
+import os
+import tempfile
+from datetime import datetime, timedelta
+from business_logic.database import TaskDatabase
+from business_logic.memory_storage import InMemoryTaskDatabase
+from business_logic.storage import IDEMPOTENCY_PENDING, create_storage
+
+
+class StorageConformanceTests:
+    """Behaviour every TaskStorage engine must share; mixed into per-engine cases"""
+    
+    def make_storage(self):
+        raise NotImplementedError
+    
+    def setUp(self):
+        """Set up a fresh storage engine before each test"""
+        self.storage = self.make_storage()
+    
+    def tearDown(self):
+        """Release the storage engine after each test"""
+        self.storage.close()
+    
+    def test_add_and_get_task(self):
+        """Test an added task can be read back by ID"""
+        task = self.storage.add_task("Conformance", 20)
+        
+        found = self.storage.get_task_by_id(task.id)
+        self.assertEqual(found.id, task.id)
+        self.assertEqual(found.title, "Conformance")
+        self.assertEqual(found.time_limit_minutes, 20)
+        self.assertEqual(found.status, "active")
+        self.assertEqual(found.created_at, task.created_at)
+    
+    def test_ids_are_unique(self):
+        """Test every added task receives a distinct ID"""
+        ids = {self.storage.add_task(f"Task {n}", 10).id for n in range(10)}
+        self.assertEqual(len(ids), 10)
+    
+    def test_missing_task(self):
+        """Test reading, updating and deleting unknown IDs"""
+        self.assertIsNone(self.storage.get_task_by_id(999))
+        self.assertFalse(self.storage.update_task_status(999, "completed"))
+        self.assertFalse(self.storage.delete_task(999))
+    
+    def test_get_all_tasks_newest_first(self):
+        """Test all tasks are listed newest first"""
+        for n in range(5):
+            self.storage.add_task(f"Task {n}", 10)
+        
+        titles = [task.title for task in self.storage.get_all_tasks()]
+        self.assertEqual(titles, [f"Task {n}" for n in reversed(range(5))])
+    
+    def test_update_task_status(self):
+        """Test status changes are visible in every query"""
+        first = self.storage.add_task("First", 10)
+        second = self.storage.add_task("Second", 10)
+        
+        self.assertTrue(self.storage.update_task_status(first.id, "completed"))
+        
+        self.assertEqual(self.storage.get_task_by_id(first.id).status, "completed")
+        self.assertEqual([t.id for t in self.storage.get_tasks_by_status("completed")], [first.id])
+        self.assertEqual([t.id for t in self.storage.get_tasks_by_status("active")], [second.id])
+        self.assertEqual(self.storage.get_tasks_by_status("missed"), [])
+    
+    def test_delete_task(self):
+        """Test deleted tasks disappear from every query"""
+        task = self.storage.add_task("Delete Me", 10)
+        
+        self.assertTrue(self.storage.delete_task(task.id))
+        
+        self.assertIsNone(self.storage.get_task_by_id(task.id))
+        self.assertEqual(self.storage.get_all_tasks(), [])
+        self.assertEqual(self.storage.get_tasks_by_status("active"), [])
+        self.assertEqual(self.storage.get_active_tasks_expiring_before(datetime.now() + timedelta(days=1)), [])
+    
+    def test_active_tasks_expiring_before(self):
+        """Test expiring tasks are active only and ordered soonest first"""
+        long = self.storage.add_task("Long", 60)
+        short = self.storage.add_task("Short", 5)
+        done = self.storage.add_task("Done", 1)
+        self.storage.update_task_status(done.id, "completed")
+        
+        now = datetime.now()
+        self.assertEqual(self.storage.get_active_tasks_expiring_before(now), [])
+        
+        soon = self.storage.get_active_tasks_expiring_before(now + timedelta(minutes=10))
+        self.assertEqual([t.id for t in soon], [short.id])
+        
+        later = self.storage.get_active_tasks_expiring_before(now + timedelta(hours=2))
+        self.assertEqual([t.id for t in later], [short.id, long.id])
+    
+    def test_returned_tasks_are_copies(self):
+        """Test mutating a returned Task does not change stored state"""
+        task = self.storage.add_task("Copy", 10)
+        
+        found = self.storage.get_task_by_id(task.id)
+        found.mark_completed()
+        
+        self.assertEqual(self.storage.get_task_by_id(task.id).status, "active")
+    
+    def test_templates_crud(self):
+        """Test templates can be added, listed and deleted"""
+        daily = self.storage.add_template("Read", 30, daily_at="21:00")
+        hourly = self.storage.add_template("Stretch", 5, interval_minutes=60)
+        
+        templates = self.storage.get_all_templates()
+        self.assertEqual([t.id for t in templates], [daily.id, hourly.id])
+        self.assertEqual(templates[0].daily_at, "21:00")
+        self.assertEqual(templates[1].interval_minutes, 60)
+        
+        self.assertTrue(self.storage.delete_template(daily.id))
+        self.assertFalse(self.storage.delete_template(daily.id))
+        self.assertEqual([t.id for t in self.storage.get_all_templates()], [hourly.id])
+    
+    def test_materialize_due_templates(self):
+        """Test due templates create one task each and advance their next run"""
+        self.storage.add_template("Stretch", 5, interval_minutes=60)
+        self.storage.add_template("Walk", 10, interval_minutes=30)
+        first_runs = {t.id: t.next_run_at for t in self.storage.get_all_templates()}
+        
+        now = datetime.now()
+        created = self.storage.materialize_due_templates(now)
+        
+        # Both interval templates are due immediately
+        self.assertEqual(created, 2)
+        titles = sorted(task.title for task in self.storage.get_all_tasks())
+        self.assertEqual(titles, ["Stretch", "Walk"])
+        
+        # Nothing new until the next occurrence
+        self.assertEqual(self.storage.materialize_due_templates(now), 0)
+        self.assertEqual(len(self.storage.get_all_tasks()), 2)
+        
+        for template in self.storage.get_all_templates():
+            interval = timedelta(minutes=template.interval_minutes)
+            self.assertEqual(template.next_run_at, first_runs[template.id] + interval)
+        
+        # A long gap produces a single catch-up task, not a backlog
+        self.assertEqual(self.storage.materialize_due_templates(now + timedelta(hours=5)), 2)
+        self.assertEqual(len(self.storage.get_all_tasks()), 4)
+    
+    def test_materialize_skips_future_templates(self):
+        """Test templates that are not yet due create nothing"""
+        template = self.storage.add_template("Read", 30, daily_at="00:00")
+        
+        self.assertEqual(self.storage.materialize_due_templates(template.next_run_at - timedelta(seconds=1)), 0)
+        self.assertEqual(self.storage.get_all_tasks(), [])
+    
+    def test_idempotency_claim_is_exclusive(self):
+        """Test only the first claimant owns a key; later ones see it pending"""
+        self.assertIsNone(self.storage.claim_idempotency_key("POST /tasks k1", "abc", 60, 60))
+        
+        self.assertEqual(self.storage.claim_idempotency_key("POST /tasks k1", "abc", 60, 60),
+                         ("abc", IDEMPOTENCY_PENDING, ""))
+        self.assertIsNone(self.storage.claim_idempotency_key("POST /tasks k2", "abc", 60, 60))
+    
+    def test_idempotency_completed_claim_returns_response(self):
+        """Test claimants after completion get the stored response"""
+        self.storage.claim_idempotency_key("POST /tasks k1", "abc", 60, 60)
+        self.storage.complete_idempotency_key("POST /tasks k1", 201, '{"ok": true}', 60, 10)
+        
+        self.assertEqual(self.storage.claim_idempotency_key("POST /tasks k1", "def", 60, 60),
+                         ("abc", 201, '{"ok": true}'))
+    
+    def test_idempotency_released_claim_can_be_retaken(self):
+        """Test a released claim is free, but a completed one is not released"""
+        self.storage.claim_idempotency_key("k1", "abc", 60, 60)
+        self.storage.release_idempotency_key("k1")
+        self.assertIsNone(self.storage.claim_idempotency_key("k1", "abc", 60, 60))
+        
+        self.storage.complete_idempotency_key("k1", 200, "{}", 60, 10)
+        self.storage.release_idempotency_key("k1")
+        self.assertEqual(self.storage.claim_idempotency_key("k1", "abc", 60, 60), ("abc", 200, "{}"))
+    
+    def test_idempotency_stale_claim_is_taken_over(self):
+        """Test a pending claim older than the pending timeout can be claimed again"""
+        self.storage.claim_idempotency_key("k1", "abc", 60, 60)
+        
+        self.assertIsNone(self.storage.claim_idempotency_key("k1", "def", 60, 0))
+        self.assertEqual(self.storage.claim_idempotency_key("k1", "abc", 60, 60),
+                         ("def", IDEMPOTENCY_PENDING, ""))
+    
+    def test_idempotency_record_expires(self):
+        """Test records older than the TTL no longer hold the key"""
+        self.storage.claim_idempotency_key("key", "abc", 60, 60)
+        self.storage.complete_idempotency_key("key", 201, "{}", 60, 10)
+        
+        self.assertIsNone(self.storage.claim_idempotency_key("key", "abc", 0, 60))
+    
+    def test_idempotency_records_bounded(self):
+        """Test the oldest records are evicted beyond max_entries"""
+        for n in range(5):
+            self.storage.claim_idempotency_key(f"key {n}", "abc", 60, 60)
+            self.storage.complete_idempotency_key(f"key {n}", 200, "{}", 60, 3)
+        
+        kept = [n for n in range(5) if self.storage.claim_idempotency_key(f"key {n}", "abc", 60, 60)]
+        self.assertEqual(kept, [2, 3, 4])
+
+
+class TestSQLiteStorageConformance(StorageConformanceTests, unittest.TestCase):
+    
+    def make_storage(self):
+        self.db_fd, self.db_path = tempfile.mkstemp()
+        return TaskDatabase(self.db_path)
+    
+    def tearDown(self):
+        """Remove the temporary database file"""
+        super().tearDown()
+        os.close(self.db_fd)
+        os.unlink(self.db_path)
+
+
+class TestBatchedSQLiteStorageConformance(TestSQLiteStorageConformance):
+    
+    def make_storage(self):
+        self.db_fd, self.db_path = tempfile.mkstemp()
+        return TaskDatabase(self.db_path, durability='batched', batch_window_ms=1)
+
+
+class TestInMemoryStorageConformance(StorageConformanceTests, unittest.TestCase):
+    
+    def make_storage(self):
+        return InMemoryTaskDatabase()
+
+
+class TestCreateStorage(unittest.TestCase):
+    
+    def test_memory_engine(self):
+        """Test the memory engine is selected by name"""
+        self.assertIsInstance(create_storage('memory'), InMemoryTaskDatabase)
+    
+    def test_unknown_engine(self):
+        """Test unknown engines are rejected"""
+        with self.assertRaises(ValueError):
+            create_storage('postgres')
@@ -0,0 +1,74 @@
+import unittest
+import os
+import tempfile
+from operations.benchmarks.stress_harness import WorkerResult, check_invariants, run_level
+from business_logic.database import TaskDatabase
+
+
+class TestStressHarness(unittest.TestCase):
+    
+    def setUp(self):
+        """Set up a scratch directory for the stress database"""
+        self.workdir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.workdir.name, 'stress.db')
+    
+    def tearDown(self):
+        """Remove the scratch directory"""
+        self.workdir.cleanup()
+    
+    def test_single_worker_database_has_no_violations(self):
+        """Test one worker cannot race itself"""
+        report = run_level('database', 1, 0.3, self.db_path)
+        
+        self.assertGreater(report.total_ops, 0)
+        self.assertEqual(report.total_errors, 0)
+        self.assertTrue(all(not items for items in report.violations.values()))
+    
+    def test_single_worker_app_has_no_violations(self):
+        """Test the HTTP target runs and its stats agree with the task list"""
+        report = run_level('app', 1, 0.3, self.db_path)
+        
+        self.assertGreater(report.total_ops, 0)
+        self.assertIn('stats_mismatch', report.violations)
+        self.assertTrue(all(not items for items in report.violations.values()))
+    
+    def test_app_target_restores_app_state(self):
+        """Test the HTTP target leaves the app's database and rate limiting as it found them"""
+        import app as app_module
+        previous_db = app_module.db
+        previous_rate_limit = app_module.app.config['RATE_LIMIT_ENABLED']
+        
+        run_level('app', 1, 0.1, self.db_path)
+        
+        self.assertIs(app_module.db, previous_db)
+        self.assertEqual(app_module.app.config['RATE_LIMIT_ENABLED'], previous_rate_limit)
+    
+    def test_concurrent_report(self):
+        """Test a concurrent run keeps row counts consistent and reports per-level metrics"""
+        report = run_level('database', 4, 0.3, self.db_path, durability='batched')
+        summary = report.to_dict()
+        
+        self.assertEqual(summary['concurrency'], 4)
+        self.assertGreater(summary['throughput_ops_per_sec'], 0)
+        self.assertEqual(summary['violations']['row_count_mismatch'], 0)
+        # Stats are only cross-checked through the HTTP API
+        self.assertNotIn('stats_mismatch', summary['violations'])
+    
+    def test_detects_conflicting_outcomes(self):
+        """Test a task confirmed both completed and missed is flagged"""
+        db = TaskDatabase(self.db_path)
+        task = db.add_task("Raced", 30)
+        db.update_task_status(task.id, 'missed')
+        
+        result = WorkerResult()
+        result.created.append(task.id)
+        result.outcomes.extend([(task.id, 'completed'), (task.id, 'missed')])
+        
+        violations = check_invariants(self.db_path, result)
+        self.assertEqual(violations['conflicting_outcomes'], [task.id])
+        self.assertEqual(violations['lost_completions'], [])
+    
+    def test_unknown_target(self):
+        """Test unknown targets are rejected"""
+        with self.assertRaises(ValueError):
+            run_level('postgres', 1, 0.1, self.db_path)
@@ -0,0 +1,116 @@
+import unittest
+import threading
+import time
+from application_server.throttling import SingleFlight, TokenBucketLimiter
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+    
+    def __call__(self):
+        return self.now
+
+
+class TestSingleFlight(unittest.TestCase):
+    
+    def setUp(self):
+        """Set up a fresh single-flight group"""
+        self.flights = SingleFlight()
+    
+    def test_single_call(self):
+        """Test a lone call runs the function and is not shared"""
+        result, shared = self.flights.do('key', lambda: 42)
+        
+        self.assertEqual(result, 42)
+        self.assertFalse(shared)
+    
+    def test_concurrent_calls_share_result(self):
+        """Test concurrent calls with the same key run the function once"""
+        calls = []
+        release = threading.Event()
+        results = []
+        
+        def work():
+            calls.append(1)
+            release.wait(5)
+            return 'value'
+        
+        def caller():
+            results.append(self.flights.do('key', work))
+        
+        threads = [threading.Thread(target=caller) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        
+        # Give the followers time to join the in-flight call
+        time.sleep(0.1)
+        release.set()
+        for thread in threads:
+            thread.join(5)
+        
+        self.assertEqual(len(results), 5)
+        self.assertTrue(all(result == 'value' for result, _ in results))
+        self.assertEqual(len(calls), sum(1 for _, shared in results if not shared))
+    
+    def test_error_propagates_and_clears_key(self):
+        """Test an exception is raised to the caller and the key is released"""
+        def fail():
+            raise ValueError('boom')
+        
+        with self.assertRaises(ValueError):
+            self.flights.do('key', fail)
+        
+        result, shared = self.flights.do('key', lambda: 'ok')
+        self.assertEqual(result, 'ok')
+        self.assertFalse(shared)
+
+
+class TestTokenBucketLimiter(unittest.TestCase):
+    
+    def setUp(self):
+        """Set up a limiter with a controllable clock"""
+        self.clock = FakeClock()
+        self.limiter = TokenBucketLimiter(capacity=3, refill_rate=1.0, clock=self.clock)
+    
+    def test_allows_burst_up_to_capacity(self):
+        """Test a client can spend its full burst"""
+        for _ in range(3):
+            allowed, retry_after = self.limiter.acquire('client')
+            self.assertTrue(allowed)
+            self.assertEqual(retry_after, 0)
+        
+        allowed, retry_after = self.limiter.acquire('client')
+        self.assertFalse(allowed)
+        self.assertEqual(retry_after, 1)
+    
+    def test_refills_over_time(self):
+        """Test tokens come back at the refill rate"""
+        for _ in range(3):
+            self.limiter.acquire('client')
+        
+        self.clock.now += 1.0
+        allowed, _ = self.limiter.acquire('client')
+        self.assertTrue(allowed)
+        
+        allowed, _ = self.limiter.acquire('client')
+        self.assertFalse(allowed)
+    
+    def test_clients_are_independent(self):
+        """Test one client's usage does not affect another"""
+        for _ in range(3):
+            self.limiter.acquire('a')
+        
+        allowed, _ = self.limiter.acquire('b')
+        self.assertTrue(allowed)
+    
+    def test_prunes_idle_clients(self):
+        """Test refilled buckets are dropped when the client table is full"""
+        limiter = TokenBucketLimiter(capacity=1, refill_rate=1.0, clock=self.clock, max_clients=2)
+        limiter.acquire('a')
+        limiter.acquire('b')
+        
+        self.clock.now += 5.0
+        limiter.acquire('c')
+        
+        self.assertEqual(set(limiter._buckets), {'c'})